@@ -8,6 +8,9 @@ PYTHON_BIN="${THOTH_PYTHON:-}"
 SYSTEM_PYTHON=""
 CONFIG_PATH=""
 PID_FILE="logs/sync.pid"
+# Seconds to let a sync cycle finish after the first SIGINT before sending a
+# second one, which aborts the cycle (the browser context is still closed).
+STOP_TIMEOUT="${THOTH_STOP_TIMEOUT:-15}"
 
 ARGS=("$@")
 for arg in "${ARGS[@]}"; do
@@ -23,7 +26,9 @@ for arg in "${ARGS[@]}"; do
     fi
     if kill -0 "$EXISTING_PID" >/dev/null 2>&1; then
       echo "Stopping sync.sh (pid $EXISTING_PID)..." >&2
-      kill -INT "$EXISTING_PID" >/dev/null 2>&1 || true
+      # TERM, not INT: only sync.sh gets this signal, so its TERM trap must send
+      # the child its first SIGINT itself (see the traps below).
+      kill -TERM "$EXISTING_PID" >/dev/null 2>&1 || true
       exit 0
     fi
     echo "PID $EXISTING_PID not running; removing stale PID file." >&2
@@ -88,15 +93,43 @@ if [ -f "$PID_FILE" ]; then
 fi
 echo "$$" > "$PID_FILE"
 
+stop_sync() {
+  local pid="$1"
+  # Pass 1 when the child already got the first SIGINT (a terminal Ctrl-C
+  # reaches the whole foreground process group), so it can finish its cycle.
+  local already_signalled="${2:-0}"
+  local waited=0
+  if [ "$already_signalled" != "1" ]; then
+    kill -INT "$pid" >/dev/null 2>&1 || return 0
+  fi
+  while kill -0 "$pid" >/dev/null 2>&1 && [ "$waited" -lt "$STOP_TIMEOUT" ]; do
+    sleep 1
+    waited=$((waited + 1))
+  done
+  if kill -0 "$pid" >/dev/null 2>&1; then
+    kill -INT "$pid" >/dev/null 2>&1 || true
+  fi
+}
+
 cleanup() {
+  local already_signalled="${1:-0}"
   if [ -n "${SYNC_PID:-}" ] && kill -0 "$SYNC_PID" >/dev/null 2>&1; then
-    kill -INT "$SYNC_PID" >/dev/null 2>&1 || true
+    stop_sync "$SYNC_PID" "$already_signalled"
     wait "$SYNC_PID" >/dev/null 2>&1 || true
   fi
   rm -f "$PID_FILE"
 }
 
-trap cleanup EXIT INT TERM
+# Signal paths:
+# - Terminal Ctrl-C: SIGINT reaches sync.sh and the child (same foreground
+#   process group), so the INT trap skips stop_sync's first SIGINT.
+# - ./sync.sh --stop (or any kill -TERM): only sync.sh is signalled, so the
+#   TERM trap sends the child its first SIGINT straight away.
+# - Either way the child gets a second SIGINT after STOP_TIMEOUT if it is
+#   still running, which aborts its current cycle.
+trap cleanup EXIT
+trap 'cleanup 1; exit 130' INT
+trap 'cleanup; exit 143' TERM
 
 ensure_dependencies
 
@@ -145,7 +178,7 @@ while true; do
       NEW_HASH="$(hash_files)"
       if [ -n "$NEW_HASH" ] && [ "$NEW_HASH" != "$LAST_HASH" ]; then
         echo "Code or config changed; restarting sync..." >&2
-        kill -INT "$SYNC_PID" >/dev/null 2>&1 || true
+        stop_sync "$SYNC_PID"
         wait "$SYNC_PID" || true
         RESTART_REASON="reload"
         break
@@ -0,0 +1,84 @@
+import gc
+import weakref
+
+import pytest
+
+from thoth import cache, db
+from thoth.agent import runner
+
+
+@pytest.fixture
+def conn():
+    cache.clear()
+    conn = db.connect(":memory:")
+    db.ensure_schema(conn)
+    source_id = db.upsert_source(conn, "slack", "slack", "https://slack.com")
+    channel_id = db.upsert_channel(conn, source_id, "general", "C1", "https://slack.com/C1")
+    for index, content in enumerate(["deploy finished", "lunch?\nanyone"]):
+        db.upsert_message(
+            conn, source_id, channel_id, f"m{index}", None, content, None,
+            f"2024-01-01T00:00:0{index}+00:00", None, None, None,
+        )
+    yield conn
+    cache.clear()
+
+
+def test_every_command_is_listed_in_help():
+    for command in runner._COMMANDS:
+        assert f"- {command}" in runner.HELP_TEXT
+
+
+def test_help(conn):
+    assert runner.handle_query(conn, "help") == runner.HELP_TEXT
+
+
+def test_commands_are_case_insensitive(conn):
+    assert runner.handle_query(conn, "HELP") == runner.HELP_TEXT
+
+
+def test_blank_and_unknown_input(conn):
+    assert runner.handle_query(conn, "   ") == ""
+    assert runner.handle_query(conn, "dance") == "Unknown command. Type 'help'."
+
+
+def test_stats(conn):
+    assert runner.handle_query(conn, "stats") == "slack#general: 2"
+
+
+def test_recent_flattens_newlines(conn):
+    assert runner.handle_query(conn, "recent").splitlines() == [
+        "[slack#general] 2024-01-01T00:00:01+00:00: lunch? anyone",
+        "[slack#general] 2024-01-01T00:00:00+00:00: deploy finished",
+    ]
+
+
+def test_search(conn):
+    assert runner.handle_query(conn, "search  dep") == (
+        "[slack#general] 2024-01-01T00:00:00+00:00: deploy finished"
+    )
+    assert runner.handle_query(conn, "search nothing-matches") == "(no results)"
+    assert runner.handle_query(conn, "search") == "Usage: search <term>"
+
+
+def test_cached_search_queries_the_term_as_typed(conn, monkeypatch):
+    seen = []
+    monkeypatch.setattr(cache.query, "search_messages", lambda conn, term, limit: seen.append(term) or [])
+    cache.search_messages(conn, " Déploy  Finished ")
+    assert seen == ["Déploy  Finished"]
+
+
+def test_cached_results_are_immutable_and_shared_safely(conn):
+    first = cache.recent_activity(conn)
+    assert isinstance(first, tuple)
+    assert cache.recent_activity(conn) is first
+
+
+def test_cache_does_not_keep_connections_alive():
+    conn = db.connect(":memory:")
+    db.ensure_schema(conn)
+    cache.channel_counts(conn)
+    ref = weakref.ref(conn)
+    conn.close()
+    del conn
+    gc.collect()
+    assert ref() is None
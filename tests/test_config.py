@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from thoth import config as config_module
+
+CONFIG_TOML = """
+[thoth]
+db_path = "data/test.db"
+
+[scrape]
+recent_message_limit = 50
+
+[[sources]]
+name = "slack"
+type = "slack"
+base_url = "https://app.slack.com/client"
+
+  [sources.selectors]
+  message_item = "div.message"
+
+  [[sources.channels]]
+  name = "general"
+  url = "https://app.slack.com/client/T1/C1"
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "thoth.toml"
+    path.write_text(CONFIG_TOML, encoding="utf-8")
+    return path
+
+
+def test_load_config_is_cached_until_the_file_changes(config_path):
+    first = config_module.load_config(str(config_path))
+    assert config_module.load_config(str(config_path)) is first
+    config_path.write_text(CONFIG_TOML.replace("50", "75"), encoding="utf-8")
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reloaded = config_module.load_config(str(config_path))
+    assert reloaded is not first
+    assert reloaded.scrape["recent_message_limit"] == 75
+
+
+def test_cached_config_mappings_are_read_only(config_path):
+    config = config_module.load_config(str(config_path))
+    with pytest.raises(TypeError):
+        config.scrape["recent_message_limit"] = 1
+    with pytest.raises(TypeError):
+        config.sources[0].selectors["message_item"] = "li"
+    assert config_module.load_config(str(config_path)).sources[0].selectors["message_item"] == "div.message"
+
+
+def test_config_caches_are_bounded():
+    assert config_module._load_config.cache_info().maxsize is not None
+    assert config_module._channel_config.cache_info().maxsize is not None
+
+
+def test_non_string_values_are_coerced(tmp_path):
+    path = tmp_path / "thoth.toml"
+    path.write_text(
+        """
+[[sources]]
+name = 123
+type = "slack"
+base_url = "https://app.slack.com/client"
+enabled = 0
+
+  [[sources.channels]]
+  name = 456
+  url = "https://app.slack.com/client/T1/C1"
+""",
+        encoding="utf-8",
+    )
+    source = config_module.load_config(str(path)).sources[0]
+    assert source.name == "123"
+    assert source.enabled is False
+    assert source.channels[0].name == "456"
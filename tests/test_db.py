@@ -0,0 +1,196 @@
+import sqlite3
+
+import pytest
+
+from thoth import db
+
+
+def _schema_version(conn):
+    return conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+def _trigger_sql(conn, name):
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (name,)
+    ).fetchone()
+    return row["sql"] if row else None
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "thoth.db")
+    conn = db.connect(path)
+    db.ensure_schema(conn)
+    conn.close()
+    return path
+
+
+def test_ensure_schema_is_a_no_op_on_current_schema(db_path):
+    conn = db.connect(db_path)
+    version = _schema_version(conn)
+    db.ensure_schema(conn)
+    assert _schema_version(conn) == version
+
+
+def test_ensure_schema_does_not_wait_for_the_write_lock(db_path):
+    writer = sqlite3.connect(db_path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        conn = sqlite3.connect(db_path, isolation_level=None, timeout=0.1)
+        conn.row_factory = sqlite3.Row
+        db.ensure_schema(conn)
+    finally:
+        writer.execute("ROLLBACK")
+
+
+def test_ensure_schema_replaces_stale_fts_update_trigger(db_path):
+    conn = db.connect(db_path)
+    conn.executescript(
+        """
+        DROP TRIGGER messages_fts_update;
+        CREATE TRIGGER messages_fts_update AFTER UPDATE ON messages BEGIN SELECT 1; END;
+        """
+    )
+    db.ensure_schema(conn)
+    assert _trigger_sql(conn, "messages_fts_update") == db._SQL_FTS_UPDATE_TRIGGER
+
+
+@pytest.fixture
+def conn():
+    conn = db.connect(":memory:")
+    db.ensure_schema(conn)
+    return conn
+
+
+@pytest.fixture
+def channel(conn):
+    source_id = db.upsert_source(conn, "slack", "slack", "https://slack.com")
+    channel_id = db.upsert_channel(conn, source_id, "general", "C1", "https://slack.com/C1")
+    return source_id, channel_id
+
+
+def _upsert(conn, channel, external_id, content, content_raw=None):
+    source_id, channel_id = channel
+    return db.upsert_message(
+        conn, source_id, channel_id, external_id, None, content, content_raw,
+        "2024-01-01T00:00:00+00:00", None, None, None,
+    )
+
+
+def _fts_ids(conn, term):
+    rows = conn.execute("SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?", (term,))
+    return sorted(row[0] for row in rows)
+
+
+def _count(conn, channel_id):
+    row = conn.execute(
+        "SELECT count FROM channel_message_counts WHERE channel_id = ?", (channel_id,)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def test_fts_index_follows_insert_edit_and_delete(conn, channel):
+    message_id, inserted, edited = _upsert(conn, channel, "m1", "launch checklist")
+    assert inserted and not edited
+    assert _fts_ids(conn, "launch") == [message_id]
+
+    _, inserted, edited = _upsert(conn, channel, "m1", "rollback plan")
+    assert not inserted and edited
+    assert _fts_ids(conn, "launch") == []
+    assert _fts_ids(conn, "rollback") == [message_id]
+
+    conn.execute("DELETE FROM message_versions WHERE message_id = ?", (message_id,))
+    conn.execute("DELETE FROM messages WHERE id = ?", (message_id,))
+    assert _fts_ids(conn, "rollback") == []
+    conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')")
+
+
+def test_fts_index_ignores_updates_that_keep_content(conn, channel):
+    message_id, _, _ = _upsert(conn, channel, "m1", "launch checklist")
+    conn.execute("UPDATE messages SET content = content, edited_at = 'x' WHERE id = ?", (message_id,))
+    assert _fts_ids(conn, "launch") == [message_id]
+    conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('integrity-check')")
+
+
+def test_channel_message_counts_track_inserts_and_deletes(conn, channel):
+    _, channel_id = channel
+    _upsert(conn, channel, "m1", "one")
+    second, _, _ = _upsert(conn, channel, "m2", "two")
+    _upsert(conn, channel, "m1", "one, edited")
+    assert _count(conn, channel_id) == 2
+    conn.execute("DELETE FROM messages WHERE id = ?", (second,))
+    assert _count(conn, channel_id) == 1
+
+
+def test_channel_message_counts_backfill_existing_rows(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = db.connect(path)
+    db.ensure_schema(conn)
+    source_id = db.upsert_source(conn, "slack", "slack", "https://slack.com")
+    channel_id = db.upsert_channel(conn, source_id, "general", "C1", "https://slack.com/C1")
+    _upsert(conn, (source_id, channel_id), "m1", "one")
+    _upsert(conn, (source_id, channel_id), "m2", "two")
+    conn.executescript(
+        """
+        DROP TRIGGER channel_message_counts_insert;
+        DROP TRIGGER channel_message_counts_delete;
+        DROP TABLE channel_message_counts;
+        """
+    )
+    db.ensure_schema(conn)
+    assert _count(conn, channel_id) == 2
+
+
+def test_reaction_without_metadata_is_stored_as_empty_object(conn, channel):
+    message_id, _, _ = _upsert(conn, channel, "m1", "hello")
+    db.upsert_reactions_bulk(conn, [(message_id, "👍", 2, None)])
+    row = conn.execute("SELECT metadata_json FROM reactions WHERE message_id = ?", (message_id,)).fetchone()
+    assert row[0] == "{}"
+
+
+def test_edit_snapshots_previous_content(conn, channel):
+    message_id, _, _ = _upsert(conn, channel, "m1", "draft", "<p>draft</p>")
+    _, _, edited = _upsert(conn, channel, "m1", "final", "<p>final</p>")
+    assert edited
+    versions = conn.execute(
+        "SELECT content, content_raw FROM message_versions WHERE message_id = ?", (message_id,)
+    ).fetchall()
+    assert [tuple(row) for row in versions] == [("draft", "<p>draft</p>")]
+
+
+def test_unchanged_upsert_does_not_snapshot(conn, channel):
+    message_id, _, _ = _upsert(conn, channel, "m1", "same")
+    _, _, edited = _upsert(conn, channel, "m1", "same")
+    assert not edited
+    count = conn.execute(
+        "SELECT COUNT(*) FROM message_versions WHERE message_id = ?", (message_id,)
+    ).fetchone()[0]
+    assert count == 0
+
+
+def test_nocase_content_index_only_without_fts(db_path):
+    conn = db.connect(db_path)
+    conn.execute("CREATE INDEX idx_messages_content_nocase ON messages(content COLLATE NOCASE)")
+    db.ensure_schema(conn)
+    assert db.has_fts(conn)
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_messages_content_nocase'"
+    ).fetchone() is None
+
+
+def test_transaction_rolls_back_when_commit_fails(db_path):
+    conn = db.connect(db_path)
+    reader = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA busy_timeout = 0")
+    conn.execute("PRAGMA journal_mode = DELETE")
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM sources").fetchone()
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            with db.transaction(conn):
+                db.upsert_source(conn, "slack", "slack", "https://slack.com")
+    finally:
+        reader.execute("ROLLBACK")
+    assert not conn.in_transaction
+    with db.transaction(conn):
+        db.upsert_source(conn, "slack", "slack", "https://slack.com")
@@ -0,0 +1,80 @@
+import pathlib
+import warnings
+
+import pytest
+
+from thoth.sync import utils
+
+
+def test_utils_source_has_no_invalid_escapes():
+    # JS regexes inside _PAGE_HELPERS_JS need doubled backslashes.
+    source = pathlib.Path(utils.__file__).read_text(encoding="utf-8")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        compile(source, utils.__file__, "exec")
+
+
+def test_iso_utc_regex_reaches_the_page_intact():
+    assert r"const ISO_UTC = /^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d)(?:\.(\d{3}|\d{6}))?Z$/;" in utils._PAGE_HELPERS_JS
+
+
+def test_plain_text_whitespace_regex_reaches_the_page_intact():
+    assert r"el.textContent.replace(/\s+/g, ' ')" in utils._PAGE_HELPERS_JS
+
+
+def test_non_positive_recent_limit_means_no_limit():
+    assert "limit == null || limit <= 0 ? messages : messages.slice(-limit)" in utils._PAGE_HELPERS_JS
+
+
+_WHITESPACE_FIXTURE = """
+<div class="msg" id="m1">
+  <span class="author">  alice  </span>
+  <div class="content">  hello   world  </div>
+  <time class="ts">
+    Today at 12:30 PM
+  </time>
+  <div class="reaction"><span class="emoji">  👍  </span><span class="count"> 3 </span></div>
+</div>
+"""
+
+_WHITESPACE_SELECTORS = {
+    "message_item": "div.msg",
+    "author": ".author",
+    "content": ".content",
+    "timestamp": "time.ts",
+    "reaction_item": ".reaction",
+    "reaction_emoji": ".emoji",
+    "reaction_count": ".count",
+}
+
+
+@pytest.fixture(scope="module")
+def page():
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as playwright:
+        try:
+            browser = playwright.chromium.launch()
+        except sync_api.Error as exc:
+            pytest.skip(f"chromium unavailable: {exc}")
+        try:
+            yield browser.new_page()
+        finally:
+            browser.close()
+
+
+def test_identity_fields_keep_rendered_text(page):
+    # raw_timestamp feeds the fallback external_id hash and emoji the reactions
+    # UNIQUE key, so both must stay the innerText the rows were stored under.
+    page.set_content(_WHITESPACE_FIXTURE)
+    utils.install_page_helpers(page, _WHITESPACE_SELECTORS)
+    [message] = utils.scroll_and_extract(page, None, None, 0)
+    rendered = page.evaluate(
+        "() => [document.querySelector('time.ts').innerText, document.querySelector('.emoji').innerText]"
+    )
+
+    assert message["raw_timestamp"] == rendered[0]
+    assert rendered[0].strip() == "Today at 12:30 PM"
+    assert message["reactions"] == [{"emoji": rendered[1], "count": 3}]
+    assert rendered[1].strip() == "👍"
+    assert message["author"] == "alice"
+    assert message["content"] == "hello world"
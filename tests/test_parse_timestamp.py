@@ -0,0 +1,31 @@
+from thoth.sync.utils import parse_timestamp
+
+
+def test_slack_epoch_with_fraction():
+    assert parse_timestamp("1718743000.123456") == "2024-06-18T20:36:40.123456+00:00"
+
+
+def test_epoch_edge_forms():
+    assert parse_timestamp("0") == "1970-01-01T00:00:00+00:00"
+    assert parse_timestamp("5.") == "1970-01-01T00:00:05+00:00"
+    assert parse_timestamp(".5") == "1970-01-01T00:00:00.500000+00:00"
+
+
+def test_out_of_range_epoch_returns_none():
+    # Millisecond epochs overflow datetime; they must not raise into sync_channel.
+    assert parse_timestamp("1718743000123") is None
+    assert parse_timestamp("9" * 400) is None
+
+
+def test_iso_timestamps():
+    assert parse_timestamp("2024-01-02T03:04:05Z") == "2024-01-02T03:04:05+00:00"
+    assert parse_timestamp(" 2024-01-02T03:04:05.5+02:00 ") == "2024-01-02T03:04:05.500000+02:00"
+
+
+def test_unparseable_and_empty():
+    assert parse_timestamp(None) is None
+    assert parse_timestamp("") is None
+    assert parse_timestamp("   ") is None
+    assert parse_timestamp("yesterday") is None
+    assert parse_timestamp("2024-02-30T00:00:00Z") is None
+    assert parse_timestamp("1.2.3") is None
@@ -0,0 +1,138 @@
+import pytest
+
+from thoth import db, query
+
+
+@pytest.fixture
+def conn():
+    conn = db.connect(":memory:")
+    db.ensure_schema(conn)
+    return conn
+
+
+def add_messages(conn, contents, channel="general"):
+    source_id = db.upsert_source(conn, "slack", "slack", "https://slack.com")
+    channel_id = db.upsert_channel(conn, source_id, channel, channel, "https://slack.com/" + channel)
+    for index, content in enumerate(contents):
+        db.upsert_message(
+            conn,
+            source_id,
+            channel_id,
+            f"{channel}-{index}",
+            None,
+            content,
+            None,
+            f"2024-01-01T00:00:{index:02d}+00:00",
+            None,
+            None,
+            None,
+        )
+    return source_id, channel_id
+
+
+def contents(rows):
+    return sorted(row["content"] for row in rows)
+
+
+def test_search_matches_word_prefixes(conn):
+    add_messages(conn, ["foobar release notes", "unrelated", "the foo fighters"])
+    assert contents(query.search_messages(conn, "foo")) == ["foobar release notes", "the foo fighters"]
+
+
+def test_search_requires_every_word(conn):
+    add_messages(conn, ["foobar release notes", "foobar only"])
+    assert contents(query.search_messages(conn, "foo rel")) == ["foobar release notes"]
+
+
+def test_search_quotes_fts_syntax(conn):
+    add_messages(conn, ['say "hi" OR bye'])
+    assert contents(query.search_messages(conn, '"hi" OR')) == ['say "hi" OR bye']
+
+
+def test_like_search_fills_remaining_slots_with_substring_matches(conn, monkeypatch):
+    monkeypatch.setattr(db, "has_fts", lambda conn: False)
+    add_messages(conn, ["deploy done", "redeploy later", "nothing here", "Deploy again"])
+    rows = query.search_messages(conn, "deploy", limit=10)
+    assert [row["content"] for row in rows] == ["Deploy again", "deploy done", "redeploy later"]
+    assert len({row["id"] for row in rows}) == 3
+
+
+def test_like_search_stops_at_limit_with_prefix_matches(conn, monkeypatch):
+    monkeypatch.setattr(db, "has_fts", lambda conn: False)
+    add_messages(conn, ["deploy done", "redeploy later", "Deploy again"])
+    rows = query.search_messages(conn, "deploy", limit=2)
+    assert [row["content"] for row in rows] == ["Deploy again", "deploy done"]
+
+
+def test_recent_activity_pages_through_shared_timestamps(conn):
+    source_id, channel_id = add_messages(conn, [])
+    for index in range(5):
+        db.upsert_message(
+            conn, source_id, channel_id, f"same-{index}", None, f"tie {index}", None,
+            "2024-01-01T00:00:00+00:00", None, None, None,
+        )
+    seen = []
+    rows, cursor = query.recent_activity(conn, limit=2)
+    while True:
+        seen.extend(row["content"] for row in rows)
+        if cursor is None:
+            break
+        rows, cursor = query.recent_activity(conn, limit=2, cursor=cursor)
+    assert sorted(seen) == [f"tie {index}" for index in range(5)]
+    assert len(seen) == 5
+
+
+def test_recent_activity_newest_first(conn):
+    add_messages(conn, ["old", "middle", "new"])
+    rows, cursor = query.recent_activity(conn, limit=5)
+    assert [row["content"] for row in rows] == ["new", "middle", "old"]
+    assert cursor is None
+
+
+def test_recent_activity_pages_past_null_timestamps(conn):
+    source_id, channel_id = add_messages(conn, [f"dated {index}" for index in range(4)])
+    for index in range(2):
+        db.upsert_message(
+            conn, source_id, channel_id, f"undated-{index}", None, f"undated {index}", None,
+            None, None, None, None,
+        )
+    seen = []
+    rows, cursor = query.recent_activity(conn, limit=3)
+    while True:
+        seen.extend(row["content"] for row in rows)
+        if cursor is None:
+            break
+        rows, cursor = query.recent_activity(conn, limit=3, cursor=cursor)
+    assert seen[:4] == ["dated 3", "dated 2", "dated 1", "dated 0"]
+    assert sorted(seen[4:]) == ["undated 0", "undated 1"]
+
+
+def test_recent_activity_cursor_on_null_timestamp_row(conn):
+    source_id, channel_id = add_messages(conn, ["dated"])
+    for index in range(4):
+        db.upsert_message(
+            conn, source_id, channel_id, f"undated-{index}", None, f"undated {index}", None,
+            None, None, None, None,
+        )
+    first, cursor = query.recent_activity(conn, limit=2)
+    assert cursor[0] is None
+    second, cursor = query.recent_activity(conn, limit=2, cursor=cursor)
+    third, cursor = query.recent_activity(conn, limit=2, cursor=cursor)
+    contents = [row["content"] for row in first + second + third]
+    assert contents[0] == "dated"
+    assert sorted(contents[1:]) == [f"undated {index}" for index in range(4)]
+    assert cursor is None
+
+
+def test_like_search_matches_wildcards_literally(conn, monkeypatch):
+    monkeypatch.setattr(db, "has_fts", lambda conn: False)
+    add_messages(conn, ["50% off", "500 off", "snake_case", "snakeXcase", "C:\\temp"])
+    assert contents(query.search_messages(conn, "50%")) == ["50% off"]
+    assert contents(query.search_messages(conn, "e_c")) == ["snake_case"]
+    assert contents(query.search_messages(conn, "\\temp")) == ["C:\\temp"]
+
+
+def test_like_search_short_terms_match_substrings(conn, monkeypatch):
+    monkeypatch.setattr(db, "has_fts", lambda conn: False)
+    add_messages(conn, ["ok then", "looks ok", "nothing"])
+    assert contents(query.search_messages(conn, "ok")) == ["looks ok", "ok then"]
@@ -0,0 +1,68 @@
+from playwright._impl import _connection, _sync_base
+from playwright.sync_api import Error as PlaywrightError
+
+from thoth.sync.runner import (
+    _extract_discord_ids,
+    _is_target_closed,
+    _lean_playwright_stack_trace,
+    configure_playwright_stack_capture,
+)
+
+
+class TargetClosedError(PlaywrightError):
+    pass
+
+
+def test_target_closed_error_type():
+    assert _is_target_closed(TargetClosedError("Target page, context or browser has been closed"))
+
+
+def test_target_closed_message_fallback():
+    assert _is_target_closed(PlaywrightError("Protocol error: Target closed"))
+    assert _is_target_closed(RuntimeError("Target closed."))
+
+
+def test_other_errors_are_not_target_closed():
+    assert not _is_target_closed(PlaywrightError("Timeout 30000ms exceeded"))
+    assert not _is_target_closed(ValueError("bad selector"))
+
+
+GUILD = "123456789012345678"
+CHANNEL = "234567890123456789"
+
+
+def test_extract_discord_ids_valid_urls():
+    assert _extract_discord_ids(f"https://discord.com/channels/{GUILD}/{CHANNEL}") == (GUILD, CHANNEL)
+    assert _extract_discord_ids(f"/channels/{GUILD}/{CHANNEL}?foo=1") == (GUILD, CHANNEL)
+    assert _extract_discord_ids(f"/channels/{GUILD}/{CHANNEL}/345678901234567890") == (GUILD, CHANNEL)
+    assert _extract_discord_ids(f"/channels/@me/{CHANNEL}") == ("@me", CHANNEL)
+    assert _extract_discord_ids(f"/channels/{GUILD}") == (GUILD, "")
+    assert _extract_discord_ids("https://discord.com/channels/@me") == ("@me", "")
+
+
+def test_extract_discord_ids_rejects_oversized_ids_and_junk():
+    assert _extract_discord_ids(f"/channels/{GUILD}123/{CHANNEL}") is None
+    assert _extract_discord_ids(f"/channels/{GUILD}/{CHANNEL}123") is None
+    assert _extract_discord_ids(f"/channels/{GUILD}/{CHANNEL}abc") is None
+    assert _extract_discord_ids(f"/channels/{GUILD}abc") is None
+    assert _extract_discord_ids("/channels/12345/67890") is None
+
+
+class _UnknownStackTrace(dict):
+    __annotations__ = {"frames": list, "location": dict}
+
+
+def test_stack_capture_patch_applies_to_known_playwright(monkeypatch):
+    monkeypatch.setenv("PW_INSPECT_STACK", "0")
+    monkeypatch.setattr(_sync_base, "_capture_stack_trace", _sync_base._capture_stack_trace)
+    configure_playwright_stack_capture()
+    assert _sync_base._capture_stack_trace is _lean_playwright_stack_trace
+
+
+def test_stack_capture_patch_skips_unknown_return_shape(monkeypatch):
+    stock = _sync_base._capture_stack_trace
+    monkeypatch.setenv("PW_INSPECT_STACK", "0")
+    monkeypatch.setattr(_sync_base, "_capture_stack_trace", stock)
+    monkeypatch.setattr(_connection, "ParsedStackTrace", _UnknownStackTrace)
+    configure_playwright_stack_capture()
+    assert _sync_base._capture_stack_trace is stock
@@ -0,0 +1,142 @@
+import hashlib
+import json
+
+import pytest
+
+from thoth import db
+from thoth.sync.models import MessageData
+from thoth.sync.runner import _message_from_raw, ingest_messages, sync_channel
+
+
+def _messages(ids, author):
+    return [
+        _message_from_raw(
+            {
+                "external_id": str(i),
+                "author": author,
+                "content": f"message {i}",
+                "raw_timestamp": f"2024-01-01T00:00:{i:02d}Z",
+            }
+        )
+        for i in ids
+    ]
+
+
+class FakePage:
+    def wait_for_selector(self, *args, **kwargs):
+        pass
+
+
+class FakeScraper:
+    selectors = {"message_item": ".message"}
+
+    def __init__(self, conn, fail_older=False, older_ids=range(5, 15)):
+        self.conn = conn
+        self.fail_older = fail_older
+        self.older_ids = older_ids
+        self.lock_held_while_scraping = False
+
+    def _check_lock(self):
+        self.lock_held_while_scraping |= self.conn.in_transaction
+
+    def open_channel(self, page, url):
+        self._check_lock()
+
+    def collect_recent_messages(self, page, limit, settle_ms):
+        self._check_lock()
+        return {"messages": _messages(range(10, 20), "alice")}
+
+    def collect_older_messages(self, page, steps, pixels, delay):
+        if self.fail_older:
+            raise RuntimeError("page crashed")
+        return {"messages": _messages(self.older_ids, "bob")}
+
+
+def _setup():
+    conn = db.connect(":memory:")
+    db.ensure_schema(conn)
+    source_id = db.upsert_source(conn, "discord", "discord", "https://discord.com")
+    channel_id = db.upsert_channel(conn, source_id, "general", None, "https://discord.com/channels/1/2")
+    return conn, source_id, channel_id
+
+
+def _message_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+def test_backfill_ingests_recent_and_older():
+    conn, source_id, channel_id = _setup()
+    db.get_sync_state(conn, source_id, channel_id)
+    conn.execute("UPDATE sync_state SET mode = 'backfill'")
+    scraper = FakeScraper(conn)
+    result = sync_channel(FakePage(), scraper, conn, source_id, channel_id, "u", {}, "discord:#general")
+    assert result["status"] == "ok"
+    assert _message_count(conn) == 15
+    assert not scraper.lock_held_while_scraping
+    state = db.get_sync_state(conn, source_id, channel_id)
+    assert state["oldest_seen_at"] == "2024-01-01T00:00:05+00:00"
+    assert state["last_seen_at"] == "2024-01-01T00:00:19+00:00"
+
+
+def test_backfill_of_already_seen_messages_still_moves_watermark():
+    conn, source_id, channel_id = _setup()
+    db.get_sync_state(conn, source_id, channel_id)
+    conn.execute("UPDATE sync_state SET mode = 'backfill'")
+    scraper = FakeScraper(conn, older_ids=range(10, 15))
+    sync_channel(FakePage(), scraper, conn, source_id, channel_id, "u", {}, "discord:#general")
+    assert _message_count(conn) == 10
+    state = db.get_sync_state(conn, source_id, channel_id)
+    assert state["oldest_seen_at"] == "2024-01-01T00:00:10+00:00"
+
+
+def test_late_scrape_failure_keeps_recent_batch():
+    conn, source_id, channel_id = _setup()
+    db.get_sync_state(conn, source_id, channel_id)
+    conn.execute("UPDATE sync_state SET mode = 'backfill'")
+    scraper = FakeScraper(conn, fail_older=True)
+    with pytest.raises(RuntimeError):
+        sync_channel(FakePage(), scraper, conn, source_id, channel_id, "u", {}, "discord:#general")
+    assert not conn.in_transaction
+    assert _message_count(conn) == 10
+
+
+def test_ingest_writes_each_field_to_its_column():
+    conn, source_id, channel_id = _setup()
+    message = MessageData(
+        external_id="m1",
+        author="alice",
+        author_external_id="alice",
+        content="hello",
+        content_raw="<p>hello</p>",
+        created_at="2024-01-01T00:00:00+00:00",
+        edited_at="2024-01-02T00:00:00+00:00",
+        thread_root_external_id="root",
+        reply_to_external_id="parent",
+        metadata={"edited": True},
+    )
+    with db.transaction(conn):
+        ingest_messages(conn, source_id, channel_id, [message])
+    row = conn.execute(
+        """
+        SELECT users.external_id AS author, content, content_raw, created_at, edited_at,
+               thread_root_external_id, reply_to_external_id, messages.metadata_json
+        FROM messages LEFT JOIN users ON users.id = messages.author_id
+        WHERE messages.external_id = 'm1'
+        """
+    ).fetchone()
+    assert json.loads(row["metadata_json"]) == {"edited": True}
+    assert tuple(row)[:-1] == (
+        "alice",
+        "hello",
+        "<p>hello</p>",
+        "2024-01-01T00:00:00+00:00",
+        "2024-01-02T00:00:00+00:00",
+        "root",
+        "parent",
+    )
+
+
+def test_fallback_external_id_is_stable_sha1():
+    # Stored fallback ids must not change, or every id-less message is re-inserted.
+    message = _message_from_raw({"author": "alice", "content": "hi", "raw_timestamp": "Today at 12:30 PM"})
+    assert message.external_id == "fallback:" + hashlib.sha1(b"Today at 12:30 PM|alice|hi").hexdigest()
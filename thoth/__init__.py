@@ -1,2 +1,2 @@
-__all__ = ["config", "db", "sync", "agent", "query"]
+__all__ = ["config", "db", "sync", "agent", "query", "cache"]
 __version__ = "0.1.0"
@@ -3,11 +3,12 @@ from __future__ import annotations
 import argparse
 import logging
 import getpass
-from typing import Optional
+import sqlite3
+from typing import Callable, Dict, Optional
 
+from thoth import cache
 from thoth import config as config_module
 from thoth import db
-from thoth import query
 
 LOGGER = logging.getLogger(__name__)
 
@@ -16,40 +17,62 @@ Thoth commands:
 - help: show this message
 - stats: show per-channel message counts
 - recent: show the most recent messages
-- search <term>: search recent messages containing <term>
+- search <term>: search messages for words starting with <term>
 - exit: quit (stdio mode only)
 """.strip()
 
 
+_NEWLINE_TABLE = str.maketrans({"\n": " ", "\r": " "})
+
+
 def format_messages(rows) -> str:
     if not rows:
         return "(no results)"
-    lines = []
-    for row in rows:
-        content = (row.get("content") or "").strip().replace("\n", " ")
-        lines.append(f"[{row.get('source')}#{row.get('channel')}] {row.get('created_at')}: {content}")
-    return "\n".join(lines)
+    return "\n".join(
+        f"[{row['source']}#{row['channel']}] {row['created_at']}: "
+        f"{(row['content'] or '').translate(_NEWLINE_TABLE).strip()}"
+        for row in rows
+    )
+
+
+def _cmd_help(conn, arg: str) -> str:
+    return HELP_TEXT
+
+
+def _cmd_stats(conn, arg: str) -> str:
+    rows = cache.channel_counts(conn)
+    if not rows:
+        return "(no data)"
+    return "\n".join(f"{row['source']}#{row['channel']}: {row['message_count']}" for row in rows)
+
+
+def _cmd_recent(conn, arg: str) -> str:
+    return format_messages(cache.recent_activity(conn))
+
+
+def _cmd_search(conn, arg: str) -> str:
+    if not arg:
+        return "Usage: search <term>"
+    return format_messages(cache.search_messages(conn, arg))
+
+
+_COMMANDS: Dict[str, Callable[[sqlite3.Connection, str], str]] = {
+    "help": _cmd_help,
+    "stats": _cmd_stats,
+    "recent": _cmd_recent,
+    "search": _cmd_search,
+}
 
 
 def handle_query(conn, text: str) -> str:
     text = text.strip()
     if not text:
         return ""
-    if text.lower() == "help":
-        return HELP_TEXT
-    if text.lower() == "stats":
-        rows = query.channel_counts(conn)
-        if not rows:
-            return "(no data)"
-        return "\n".join(
-            f"{row['source']}#{row['channel']}: {row['message_count']}" for row in rows
-        )
-    if text.lower() == "recent":
-        return format_messages(query.recent_activity(conn))
-    if text.lower().startswith("search "):
-        term = text[7:].strip()
-        return format_messages(query.search_messages(conn, term))
-    return "Unknown command. Type 'help'."
+    command, *rest = text.split(None, 1)
+    handler = _COMMANDS.get(command.lower())
+    if handler is None:
+        return "Unknown command. Type 'help'."
+    return handler(conn, rest[0] if rest else "")
 
 
 def run_stdio(config_path: Optional[str]) -> None:
@@ -60,10 +83,10 @@ def run_stdio(config_path: Optional[str]) -> None:
     print("Thoth is listening. Type 'help' for commands.\n")
     while True:
         try:
-            text = input("thoth> ")
+            text = input("thoth> ").strip()
         except EOFError:
             break
-        if text.strip().lower() == "exit":
+        if text.lower() == "exit":
             break
         response = handle_query(conn, text)
         if response:
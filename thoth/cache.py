@@ -0,0 +1,68 @@
+import sqlite3
+import weakref
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+from thoth import query
+
+Epoch = Tuple[int, int]
+Rows = Tuple[sqlite3.Row, ...]
+
+_MAX_ENTRIES = 256
+# One LRU per connection, dropped with the connection itself. Entries keep the
+# epoch they were read at and are refreshed once the database has changed.
+_CACHES: "weakref.WeakKeyDictionary[sqlite3.Connection, OrderedDict[Hashable, Tuple[Epoch, Rows]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def write_epoch(conn: sqlite3.Connection) -> Epoch:
+    # data_version moves when another connection (the sync process) commits;
+    # total_changes moves when this connection writes.
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    return int(data_version), conn.total_changes
+
+
+def _entries(conn: sqlite3.Connection) -> Optional["OrderedDict[Hashable, Tuple[Epoch, Rows]]"]:
+    try:
+        return _CACHES.setdefault(conn, OrderedDict())
+    except TypeError:
+        # Not weakly referenceable (a connection not made by db.connect): no cache.
+        return None
+
+
+def _cached(conn: sqlite3.Connection, key: Hashable, load: Callable[[], Iterable[sqlite3.Row]]) -> Rows:
+    entries = _entries(conn)
+    if entries is None:
+        return tuple(load())
+    epoch = write_epoch(conn)
+    hit = entries.get(key)
+    if hit is not None and hit[0] == epoch:
+        entries.move_to_end(key)
+        return hit[1]
+    # Tuples, so no caller can change what the next one gets back.
+    rows = tuple(load())
+    entries[key] = (epoch, rows)
+    entries.move_to_end(key)
+    if len(entries) > _MAX_ENTRIES:
+        entries.popitem(last=False)
+    return rows
+
+
+def channel_counts(conn: sqlite3.Connection) -> Rows:
+    return _cached(conn, ("channel_counts",), lambda: query.channel_counts(conn))
+
+
+def recent_activity(conn: sqlite3.Connection, limit: int = 5) -> Rows:
+    return _cached(conn, ("recent", limit), lambda: query.recent_activity(conn, limit)[0])
+
+
+def search_messages(conn: sqlite3.Connection, term: str, limit: int = 10) -> Rows:
+    # Only strip: collapsing spaces or lowercasing would change LIKE fallback
+    # results (SQLite's LIKE folds ASCII case only).
+    term = term.strip()
+    return _cached(conn, ("search", term, limit), lambda: query.search_messages(conn, term, limit))
+
+
+def clear() -> None:
+    _CACHES.clear()
@@ -1,16 +1,19 @@
 import os
 import pathlib
+import sys
 try:
     import tomllib  # type: ignore
 except ImportError:  # pragma: no cover
     import tomli as tomllib  # type: ignore
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 DEFAULT_CONFIG_PATH = pathlib.Path("config/thoth.toml")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ChannelConfig:
     name: str
     url: str
@@ -18,25 +21,25 @@ class ChannelConfig:
     mode: str = "auto"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class SourceConfig:
     name: str
     type: str
     base_url: str
     enabled: bool = True
-    selectors: Dict[str, str] = field(default_factory=dict)
-    channels: List[ChannelConfig] = field(default_factory=list)
+    selectors: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+    channels: Tuple[ChannelConfig, ...] = ()
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ThothConfig:
     db_path: str
     profile_dir: str
     headless: bool
     slow_mo_ms: int
     loop_delay_seconds: int
-    scrape: Dict[str, Any]
-    sources: List[SourceConfig]
+    scrape: Mapping[str, Any]
+    sources: Tuple[SourceConfig, ...]
 
 
 def resolve_config_path(cli_path: Optional[str] = None) -> pathlib.Path:
@@ -48,35 +51,55 @@ def resolve_config_path(cli_path: Optional[str] = None) -> pathlib.Path:
     return DEFAULT_CONFIG_PATH
 
 
-def _parse_sources(raw_sources: List[Dict[str, Any]]) -> List[SourceConfig]:
+@lru_cache(maxsize=1024)
+def _channel_config(name: str, url: str, enabled: bool, mode: str) -> ChannelConfig:
+    # One shared instance per distinct channel across reloads.
+    return ChannelConfig(name=name, url=url, enabled=enabled, mode=mode)
+
+
+def _intern(value: Any) -> str:
+    # TOML may hold numbers where strings are expected (e.g. `name = 123`).
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+
+def _parse_sources(raw_sources: List[Dict[str, Any]]) -> Tuple[SourceConfig, ...]:
     sources: List[SourceConfig] = []
     for raw in raw_sources:
-        channels = [
-            ChannelConfig(
-                name=channel.get("name", ""),
-                url=channel.get("url", ""),
-                enabled=channel.get("enabled", True),
-                mode=channel.get("mode", "auto"),
+        channels = tuple(
+            _channel_config(
+                _intern(channel.get("name", "")),
+                _intern(channel.get("url", "")),
+                bool(channel.get("enabled", True)),
+                _intern(channel.get("mode", "auto")),
             )
             for channel in raw.get("channels", [])
-        ]
+        )
         sources.append(
             SourceConfig(
-                name=raw.get("name", ""),
-                type=raw.get("type", ""),
-                base_url=raw.get("base_url", ""),
-                enabled=raw.get("enabled", True),
-                selectors=raw.get("selectors", {}),
+                name=_intern(raw.get("name", "")),
+                type=_intern(raw.get("type", "")),
+                base_url=_intern(raw.get("base_url", "")),
+                enabled=bool(raw.get("enabled", True)),
+                # Read-only views: cached configs are shared by every caller.
+                selectors=MappingProxyType(dict(raw.get("selectors", {}))),
                 channels=channels,
             )
         )
-    return sources
+    return tuple(sources)
 
 
 def load_config(cli_path: Optional[str] = None) -> ThothConfig:
     path = resolve_config_path(cli_path)
     if not path.exists():
         raise FileNotFoundError(f"Config file not found: {path}")
+    return _load_config(str(path), path.stat().st_mtime_ns)
+
+
+# Keyed by mtime so edits reload; a few entries cover repeated reloads of
+# the same file without growing with every edit.
+@lru_cache(maxsize=8)
+def _load_config(path_str: str, mtime_ns: int) -> ThothConfig:
+    path = pathlib.Path(path_str)
     with path.open("rb") as handle:
         raw = tomllib.load(handle)
 
@@ -90,6 +113,6 @@ def load_config(cli_path: Optional[str] = None) -> ThothConfig:
         headless=bool(thoth.get("headless", False)),
         slow_mo_ms=int(thoth.get("slow_mo_ms", 200)),
         loop_delay_seconds=int(thoth.get("loop_delay_seconds", 20)),
-        scrape=scrape,
+        scrape=MappingProxyType(dict(scrape)),
         sources=sources,
     )
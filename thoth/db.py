@@ -1,168 +1,453 @@
 import json
 import pathlib
 import sqlite3
-from datetime import datetime
-from typing import Any, Dict, Optional, Tuple
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_SQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    base_url TEXT,
+    metadata_json TEXT,
+    UNIQUE(name, type)
+);
+
+CREATE TABLE IF NOT EXISTS channels (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    name TEXT,
+    external_id TEXT,
+    url TEXT,
+    is_dm INTEGER DEFAULT 0,
+    metadata_json TEXT,
+    UNIQUE(source_id, external_id),
+    FOREIGN KEY(source_id) REFERENCES sources(id)
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    external_id TEXT NOT NULL,
+    handle TEXT,
+    display_name TEXT,
+    metadata_json TEXT,
+    UNIQUE(source_id, external_id),
+    FOREIGN KEY(source_id) REFERENCES sources(id)
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    external_id TEXT NOT NULL,
+    author_id INTEGER,
+    thread_root_external_id TEXT,
+    reply_to_external_id TEXT,
+    content TEXT,
+    content_raw TEXT,
+    created_at TEXT,
+    edited_at TEXT,
+    deleted_at TEXT,
+    is_deleted INTEGER DEFAULT 0,
+    metadata_json TEXT,
+    UNIQUE(source_id, external_id),
+    FOREIGN KEY(source_id) REFERENCES sources(id),
+    FOREIGN KEY(channel_id) REFERENCES channels(id),
+    FOREIGN KEY(author_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS message_versions (
+    id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    captured_at TEXT NOT NULL,
+    content TEXT,
+    content_raw TEXT,
+    metadata_json TEXT,
+    FOREIGN KEY(message_id) REFERENCES messages(id)
+);
+
+CREATE TABLE IF NOT EXISTS reactions (
+    id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    user_id INTEGER,
+    emoji TEXT NOT NULL,
+    count INTEGER DEFAULT 1,
+    created_at TEXT,
+    metadata_json TEXT,
+    UNIQUE(message_id, emoji),
+    FOREIGN KEY(message_id) REFERENCES messages(id),
+    FOREIGN KEY(user_id) REFERENCES users(id)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    channel_id INTEGER,
+    message_id INTEGER,
+    type TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    payload_json TEXT,
+    FOREIGN KEY(source_id) REFERENCES sources(id),
+    FOREIGN KEY(channel_id) REFERENCES channels(id),
+    FOREIGN KEY(message_id) REFERENCES messages(id)
+);
+
+CREATE TABLE IF NOT EXISTS embeddings (
+    id INTEGER PRIMARY KEY,
+    message_id INTEGER NOT NULL,
+    model TEXT NOT NULL,
+    embedding BLOB,
+    created_at TEXT NOT NULL,
+    metadata_json TEXT,
+    UNIQUE(message_id, model),
+    FOREIGN KEY(message_id) REFERENCES messages(id)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    channel_id INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    last_seen_at TEXT,
+    oldest_seen_at TEXT,
+    cursor_json TEXT,
+    idle_cycles INTEGER DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    UNIQUE(source_id, channel_id),
+    FOREIGN KEY(source_id) REFERENCES sources(id),
+    FOREIGN KEY(channel_id) REFERENCES channels(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_messages_channel_created
+    ON messages(channel_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_messages_created
+    ON messages(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_events_source_created
+    ON events(source_id, created_at);
+
+CREATE TRIGGER IF NOT EXISTS messages_version_on_edit
+AFTER UPDATE OF content, content_raw ON messages
+WHEN old.content IS NOT new.content OR old.content_raw IS NOT new.content_raw
+BEGIN
+    INSERT INTO message_versions (message_id, captured_at, content, content_raw, metadata_json)
+    VALUES (
+        old.id,
+        strftime('%Y-%m-%dT%H:%M:%S+00:00', 'now'),
+        old.content,
+        old.content_raw,
+        json_object('previous_metadata', old.metadata_json)
+    );
+END;
+"""
+
+_SQL_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    content,
+    content = messages,
+    content_rowid = id,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+"""
+
+# Older databases carry an update trigger without the content-change guard;
+# _ensure_fts swaps it only when the stored definition differs from this one.
+_SQL_FTS_UPDATE_TRIGGER = """CREATE TRIGGER messages_fts_update AFTER UPDATE OF content ON messages
+WHEN old.content IS NOT new.content
+BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+    INSERT INTO messages_fts(rowid, content) VALUES (new.id, new.content);
+END"""
+
+# Separate statements so the table, its triggers and the backfill can share
+# one transaction (executescript would commit between them).
+_SQL_COUNTS_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS channel_message_counts (
+        channel_id INTEGER PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0,
+        FOREIGN KEY(channel_id) REFERENCES channels(id)
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS channel_message_counts_insert AFTER INSERT ON messages BEGIN
+        INSERT INTO channel_message_counts(channel_id, count) VALUES (new.channel_id, 1)
+        ON CONFLICT(channel_id) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS channel_message_counts_delete AFTER DELETE ON messages BEGIN
+        UPDATE channel_message_counts SET count = count - 1 WHERE channel_id = old.channel_id;
+    END
+    """,
+)
+
+_SQL_HAS_TABLE = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+
+_SQL_HAS_INDEX = "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?"
+
+# Only the LIKE fallback uses this index, so it exists only without FTS5.
+_SQL_CONTENT_NOCASE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_messages_content_nocase
+    ON messages(content COLLATE NOCASE)
+"""
+
+_SQL_TRIGGER_SQL = "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?"
+
+_SQL_COUNTS_BACKFILL = """
+INSERT INTO channel_message_counts (channel_id, count)
+SELECT channel_id, COUNT(*) FROM messages GROUP BY channel_id
+"""
+
+_SQL_FTS_REBUILD = "INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"
+
+_SQL_UPSERT_SOURCE = """
+INSERT INTO sources (name, type, base_url)
+VALUES (?, ?, ?)
+ON CONFLICT(name, type) DO UPDATE SET base_url = excluded.base_url
+RETURNING id
+"""
+
+_SQL_UPSERT_CHANNEL = """
+INSERT INTO channels (source_id, name, external_id, url, metadata_json)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(source_id, external_id) DO UPDATE SET
+    name = excluded.name,
+    url = excluded.url,
+    metadata_json = excluded.metadata_json
+RETURNING id
+"""
+
+_SQL_UPSERT_USERS = """
+INSERT INTO users (source_id, external_id, handle, display_name, metadata_json)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(source_id, external_id) DO UPDATE SET
+    handle = excluded.handle,
+    display_name = excluded.display_name,
+    metadata_json = excluded.metadata_json
+"""
+
+_SQL_UPSERT_USER = _SQL_UPSERT_USERS + "RETURNING id"
+
+_SQL_USER_IDS = """
+SELECT id, external_id
+FROM users
+WHERE source_id = ? AND external_id IN ({placeholders})
+"""
+
+_SQL_MESSAGE_STATES = """
+SELECT id, external_id, author_id, thread_root_external_id, reply_to_external_id,
+    content, content_raw, edited_at, metadata_json
+FROM messages
+WHERE source_id = ? AND external_id IN ({placeholders})
+"""
+
+_SQL_UPSERT_MESSAGE = """
+INSERT INTO messages (
+    source_id, channel_id, external_id, author_id,
+    thread_root_external_id, reply_to_external_id,
+    content, content_raw, created_at, edited_at, metadata_json
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, external_id) DO UPDATE SET
+    author_id = COALESCE(excluded.author_id, author_id),
+    content = COALESCE(excluded.content, content),
+    content_raw = COALESCE(excluded.content_raw, content_raw),
+    edited_at = COALESCE(excluded.edited_at, edited_at),
+    thread_root_external_id = COALESCE(excluded.thread_root_external_id, thread_root_external_id),
+    reply_to_external_id = COALESCE(excluded.reply_to_external_id, reply_to_external_id),
+    metadata_json = COALESCE(excluded.metadata_json, metadata_json)
+"""
+
+_SQL_INSERT_MESSAGE = """
+INSERT INTO messages (
+    source_id, channel_id, external_id, author_id,
+    thread_root_external_id, reply_to_external_id,
+    content, content_raw, created_at, edited_at, metadata_json
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(source_id, external_id) DO NOTHING
+RETURNING id
+"""
+
+_SQL_UPDATE_MESSAGE = """
+UPDATE messages SET
+    author_id = COALESCE(?, author_id),
+    content = COALESCE(?, content),
+    content_raw = COALESCE(?, content_raw),
+    edited_at = COALESCE(?, edited_at),
+    thread_root_external_id = COALESCE(?, thread_root_external_id),
+    reply_to_external_id = COALESCE(?, reply_to_external_id),
+    metadata_json = COALESCE(?, metadata_json)
+WHERE source_id = ? AND external_id = ?
+RETURNING id
+"""
+
+_SQL_UPSERT_REACTION = """
+INSERT INTO reactions (message_id, emoji, count, metadata_json)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(message_id, emoji) DO UPDATE SET
+    count = excluded.count,
+    metadata_json = excluded.metadata_json
+"""
+
+_SQL_INSERT_EVENT = """
+INSERT INTO events (source_id, channel_id, message_id, type, created_at, payload_json)
+VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_SYNC_STATE = "SELECT * FROM sync_state WHERE source_id = ? AND channel_id = ?"
+
+_SQL_SYNC_STATES = "SELECT * FROM sync_state WHERE source_id = ?"
+
+_SQL_INSERT_SYNC_STATE = """
+INSERT INTO sync_state (source_id, channel_id, mode, updated_at)
+VALUES (?, ?, ?, ?)
+"""
+
+_SQL_UPDATE_SYNC_STATE = """
+UPDATE sync_state SET
+    mode = ?,
+    last_seen_at = ?,
+    oldest_seen_at = ?,
+    cursor_json = ?,
+    idle_cycles = ?,
+    updated_at = ?
+WHERE source_id = ? AND channel_id = ?
+"""
+
+
+class _Connection(sqlite3.Connection):
+    # Plain sqlite3.Connection objects cannot be weakly referenced; this lets
+    # thoth.cache hold per-connection results without keeping closed ones alive.
+    pass
 
 
 def connect(db_path: str) -> sqlite3.Connection:
     path = pathlib.Path(db_path)
     if not path.parent.exists():
         path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(path)
+    # Autocommit mode: writers group statements with transaction() explicitly.
+    conn = sqlite3.connect(
+        path,
+        cached_statements=512,
+        isolation_level=None,
+        check_same_thread=False,
+        factory=_Connection,
+    )
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    conn.execute("PRAGMA busy_timeout=5000")
     conn.execute("PRAGMA foreign_keys=ON")
     return conn
 
 
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    try:
+        conn.execute("COMMIT")
+    except BaseException:
+        # A failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open, and
+        # every later BEGIN IMMEDIATE on this connection would fail.
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
 def ensure_schema(conn: sqlite3.Connection) -> None:
-    conn.executescript(
-        """
-        CREATE TABLE IF NOT EXISTS sources (
-            id INTEGER PRIMARY KEY,
-            name TEXT NOT NULL,
-            type TEXT NOT NULL,
-            base_url TEXT,
-            metadata_json TEXT,
-            UNIQUE(name, type)
-        );
-
-        CREATE TABLE IF NOT EXISTS channels (
-            id INTEGER PRIMARY KEY,
-            source_id INTEGER NOT NULL,
-            name TEXT,
-            external_id TEXT,
-            url TEXT,
-            is_dm INTEGER DEFAULT 0,
-            metadata_json TEXT,
-            UNIQUE(source_id, external_id),
-            FOREIGN KEY(source_id) REFERENCES sources(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            source_id INTEGER NOT NULL,
-            external_id TEXT NOT NULL,
-            handle TEXT,
-            display_name TEXT,
-            metadata_json TEXT,
-            UNIQUE(source_id, external_id),
-            FOREIGN KEY(source_id) REFERENCES sources(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS messages (
-            id INTEGER PRIMARY KEY,
-            source_id INTEGER NOT NULL,
-            channel_id INTEGER NOT NULL,
-            external_id TEXT NOT NULL,
-            author_id INTEGER,
-            thread_root_external_id TEXT,
-            reply_to_external_id TEXT,
-            content TEXT,
-            content_raw TEXT,
-            created_at TEXT,
-            edited_at TEXT,
-            deleted_at TEXT,
-            is_deleted INTEGER DEFAULT 0,
-            metadata_json TEXT,
-            UNIQUE(source_id, external_id),
-            FOREIGN KEY(source_id) REFERENCES sources(id),
-            FOREIGN KEY(channel_id) REFERENCES channels(id),
-            FOREIGN KEY(author_id) REFERENCES users(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS message_versions (
-            id INTEGER PRIMARY KEY,
-            message_id INTEGER NOT NULL,
-            captured_at TEXT NOT NULL,
-            content TEXT,
-            content_raw TEXT,
-            metadata_json TEXT,
-            FOREIGN KEY(message_id) REFERENCES messages(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS reactions (
-            id INTEGER PRIMARY KEY,
-            message_id INTEGER NOT NULL,
-            user_id INTEGER,
-            emoji TEXT NOT NULL,
-            count INTEGER DEFAULT 1,
-            created_at TEXT,
-            metadata_json TEXT,
-            UNIQUE(message_id, emoji),
-            FOREIGN KEY(message_id) REFERENCES messages(id),
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY,
-            source_id INTEGER NOT NULL,
-            channel_id INTEGER,
-            message_id INTEGER,
-            type TEXT NOT NULL,
-            created_at TEXT NOT NULL,
-            payload_json TEXT,
-            FOREIGN KEY(source_id) REFERENCES sources(id),
-            FOREIGN KEY(channel_id) REFERENCES channels(id),
-            FOREIGN KEY(message_id) REFERENCES messages(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS embeddings (
-            id INTEGER PRIMARY KEY,
-            message_id INTEGER NOT NULL,
-            model TEXT NOT NULL,
-            embedding BLOB,
-            created_at TEXT NOT NULL,
-            metadata_json TEXT,
-            UNIQUE(message_id, model),
-            FOREIGN KEY(message_id) REFERENCES messages(id)
-        );
-
-        CREATE TABLE IF NOT EXISTS sync_state (
-            id INTEGER PRIMARY KEY,
-            source_id INTEGER NOT NULL,
-            channel_id INTEGER NOT NULL,
-            mode TEXT NOT NULL,
-            last_seen_at TEXT,
-            oldest_seen_at TEXT,
-            cursor_json TEXT,
-            idle_cycles INTEGER DEFAULT 0,
-            updated_at TEXT NOT NULL,
-            UNIQUE(source_id, channel_id),
-            FOREIGN KEY(source_id) REFERENCES sources(id),
-            FOREIGN KEY(channel_id) REFERENCES channels(id)
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_messages_channel_created
-            ON messages(channel_id, created_at);
-        CREATE INDEX IF NOT EXISTS idx_events_source_created
-            ON events(source_id, created_at);
-        """
-    )
-    conn.commit()
+    # executescript commits on its own, so schema setup runs outside transaction().
+    conn.executescript(_SQL_SCHEMA)
+    _ensure_channel_counts(conn)
+    _ensure_fts(conn)
+
+
+def _ensure_channel_counts(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(_SQL_HAS_TABLE, ("channel_message_counts",)).fetchone()
+    if exists:
+        for statement in _SQL_COUNTS_SCHEMA:
+            conn.execute(statement)
+        return
+    # Triggers and backfill commit together, so no concurrent insert can be
+    # counted by a trigger and again by the backfill.
+    with transaction(conn):
+        # Another process may have created it while we waited for the lock.
+        created_meanwhile = conn.execute(_SQL_HAS_TABLE, ("channel_message_counts",)).fetchone()
+        for statement in _SQL_COUNTS_SCHEMA:
+            conn.execute(statement)
+        if not created_meanwhile:
+            conn.execute(_SQL_COUNTS_BACKFILL)
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> None:
+    exists = conn.execute(_SQL_HAS_TABLE, ("messages_fts",)).fetchone()
+    try:
+        conn.executescript(_SQL_FTS_SCHEMA)
+    except sqlite3.OperationalError as exc:
+        # SQLite built without FTS5; search falls back to LIKE scans.
+        if "no such module: fts5" in str(exc):
+            conn.execute(_SQL_CONTENT_NOCASE_INDEX)
+            return
+        raise
+    if conn.execute(_SQL_HAS_INDEX, ("idx_messages_content_nocase",)).fetchone():
+        conn.execute("DROP INDEX idx_messages_content_nocase")
+    row = conn.execute(_SQL_TRIGGER_SQL, ("messages_fts_update",)).fetchone()
+    if row is None or row["sql"] != _SQL_FTS_UPDATE_TRIGGER:
+        # Drop and create together so a lock error can't leave edits unindexed.
+        with transaction(conn):
+            conn.execute("DROP TRIGGER IF EXISTS messages_fts_update")
+            conn.execute(_SQL_FTS_UPDATE_TRIGGER)
+    if not exists:
+        # External-content tables read rowids from `messages`, so a NOT IN
+        # backfill would see every row as indexed; rebuild once instead.
+        conn.execute(_SQL_FTS_REBUILD)
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    row = conn.execute(_SQL_HAS_TABLE, ("messages_fts",)).fetchone()
+    return row is not None
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
 
 
 def _json_dumps(value: Any) -> Optional[str]:
     if value is None:
         return None
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
     return json.dumps(value, ensure_ascii=True)
 
 
 def upsert_source(conn: sqlite3.Connection, name: str, source_type: str, base_url: str) -> int:
-    conn.execute(
-        """
-        INSERT INTO sources (name, type, base_url)
-        VALUES (?, ?, ?)
-        ON CONFLICT(name, type) DO UPDATE SET base_url = excluded.base_url
-        """,
-        (name, source_type, base_url),
-    )
-    row = conn.execute(
-        "SELECT id FROM sources WHERE name = ? AND type = ?",
-        (name, source_type),
-    ).fetchone()
-    conn.commit()
+    row = conn.execute(_SQL_UPSERT_SOURCE, (name, source_type, base_url)).fetchone()
     return int(row["id"])
 
 
@@ -174,25 +459,31 @@ def upsert_channel(
     url: str,
     metadata: Optional[Dict[str, Any]] = None,
 ) -> int:
-    conn.execute(
-        """
-        INSERT INTO channels (source_id, name, external_id, url, metadata_json)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(source_id, external_id) DO UPDATE SET
-            name = excluded.name,
-            url = excluded.url,
-            metadata_json = excluded.metadata_json
-        """,
-        (source_id, name, external_id, url, _json_dumps(metadata)),
-    )
     row = conn.execute(
-        "SELECT id FROM channels WHERE source_id = ? AND external_id IS ?",
-        (source_id, external_id),
+        _SQL_UPSERT_CHANNEL,
+        (source_id, name, external_id, url, _json_dumps(metadata)),
     ).fetchone()
-    conn.commit()
     return int(row["id"])
 
 
+def _select_by_external_ids(
+    conn: sqlite3.Connection,
+    sql: str,
+    source_id: int,
+    external_ids: List[str],
+    chunk_size: int = 512,
+) -> Iterable[sqlite3.Row]:
+    for start in range(0, len(external_ids), chunk_size):
+        chunk = external_ids[start : start + chunk_size]
+        # Pad IN lists to a power-of-two width so the connection's statement
+        # cache reuses a few prepared statements instead of one per batch size.
+        width = 1 << (len(chunk) - 1).bit_length()
+        chunk += [chunk[-1]] * (width - len(chunk))
+        yield from conn.execute(
+            sql.format(placeholders=",".join("?" * width)), (source_id, *chunk)
+        )
+
+
 def upsert_user(
     conn: sqlite3.Connection,
     source_id: int,
@@ -201,57 +492,84 @@ def upsert_user(
     display_name: Optional[str],
     metadata: Optional[Dict[str, Any]] = None,
 ) -> int:
-    conn.execute(
-        """
-        INSERT INTO users (source_id, external_id, handle, display_name, metadata_json)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(source_id, external_id) DO UPDATE SET
-            handle = excluded.handle,
-            display_name = excluded.display_name,
-            metadata_json = excluded.metadata_json
-        """,
-        (source_id, external_id, handle, display_name, _json_dumps(metadata)),
-    )
     row = conn.execute(
-        "SELECT id FROM users WHERE source_id = ? AND external_id = ?",
-        (source_id, external_id),
+        _SQL_UPSERT_USER,
+        (source_id, external_id, handle, display_name, _json_dumps(metadata)),
     ).fetchone()
-    conn.commit()
     return int(row["id"])
 
 
-def fetch_message_by_external_id(
+def upsert_users_bulk(
     conn: sqlite3.Connection,
     source_id: int,
-    external_id: str,
-) -> Optional[sqlite3.Row]:
-    return conn.execute(
-        "SELECT * FROM messages WHERE source_id = ? AND external_id = ?",
-        (source_id, external_id),
-    ).fetchone()
+    rows: Iterable[Tuple[str, Optional[str], Optional[str], Optional[Dict[str, Any]]]],
+) -> Dict[str, int]:
+    # Rows are (external_id, handle, display_name, metadata); returns external_id -> id.
+    params = [
+        (source_id, external_id, handle, display_name, _json_dumps(metadata))
+        for external_id, handle, display_name, metadata in rows
+    ]
+    conn.executemany(_SQL_UPSERT_USERS, params)
+    external_ids = list(dict.fromkeys(param[1] for param in params))
+    return {
+        row["external_id"]: int(row["id"])
+        for row in _select_by_external_ids(conn, _SQL_USER_IDS, source_id, external_ids)
+    }
+
+
+def fetch_message_states(
+    conn: sqlite3.Connection,
+    source_id: int,
+    external_ids: List[str],
+    chunk_size: int = 512,
+) -> Dict[str, sqlite3.Row]:
+    return {
+        row["external_id"]: row
+        for row in _select_by_external_ids(
+            conn, _SQL_MESSAGE_STATES, source_id, external_ids, chunk_size
+        )
+    }
+
+
+# Columns _SQL_UPSERT_MESSAGE can overwrite, keyed by their position in a row.
+_MESSAGE_UPDATE_COLUMNS = (
+    (3, "author_id"),
+    (4, "thread_root_external_id"),
+    (5, "reply_to_external_id"),
+    (6, "content"),
+    (7, "content_raw"),
+    (9, "edited_at"),
+    (10, "metadata_json"),
+)
+
+
+def _message_row_changes(previous: sqlite3.Row, params: Tuple[Any, ...]) -> bool:
+    # NULLs never overwrite (COALESCE), so only non-None differing values count.
+    for index, column in _MESSAGE_UPDATE_COLUMNS:
+        value = params[index]
+        if value is not None and value != previous[column]:
+            return True
+    return False
 
 
-def record_message_version(
+def upsert_messages_bulk(
     conn: sqlite3.Connection,
-    message_id: int,
-    content: Optional[str],
-    content_raw: Optional[str],
-    metadata: Optional[Dict[str, Any]] = None,
-) -> None:
-    conn.execute(
-        """
-        INSERT INTO message_versions (message_id, captured_at, content, content_raw, metadata_json)
-        VALUES (?, ?, ?, ?, ?)
-        """,
-        (
-            message_id,
-            datetime.utcnow().isoformat(),
-            content,
-            content_raw,
-            _json_dumps(metadata),
-        ),
-    )
-    conn.commit()
+    rows: Iterable[Tuple[Any, ...]],
+    existing: Optional[Dict[str, sqlite3.Row]] = None,
+) -> int:
+    # Rows follow the messages column order, ending with a metadata dict.
+    # With `existing` (from fetch_message_states), rows that would not change
+    # the stored message are skipped. Returns the number of rows written.
+    params = [(*row[:-1], _json_dumps(row[-1])) for row in rows]
+    if existing:
+        params = [
+            param
+            for param in params
+            if param[2] not in existing or _message_row_changes(existing[param[2]], param)
+        ]
+    if params:
+        conn.executemany(_SQL_UPSERT_MESSAGE, params)
+    return len(params)
 
 
 def upsert_message(
@@ -268,52 +586,9 @@ def upsert_message(
     reply_to_external_id: Optional[str],
     metadata: Optional[Dict[str, Any]] = None,
 ) -> Tuple[int, bool, bool]:
-    existing = fetch_message_by_external_id(conn, source_id, external_id)
-    edited = False
-    if existing is not None:
-        if (existing["content"] != content) or (existing["content_raw"] != content_raw):
-            record_message_version(
-                conn,
-                int(existing["id"]),
-                existing["content"],
-                existing["content_raw"],
-                {"previous_metadata": existing["metadata_json"]},
-            )
-            edited = True
-        conn.execute(
-            """
-            UPDATE messages SET
-                author_id = COALESCE(?, author_id),
-                content = COALESCE(?, content),
-                content_raw = COALESCE(?, content_raw),
-                edited_at = COALESCE(?, edited_at),
-                thread_root_external_id = COALESCE(?, thread_root_external_id),
-                reply_to_external_id = COALESCE(?, reply_to_external_id),
-                metadata_json = COALESCE(?, metadata_json)
-            WHERE id = ?
-            """,
-            (
-                author_id,
-                content,
-                content_raw,
-                edited_at,
-                thread_root_external_id,
-                reply_to_external_id,
-                _json_dumps(metadata),
-                int(existing["id"]),
-            ),
-        )
-        conn.commit()
-        return int(existing["id"]), False, edited
-
-    conn.execute(
-        """
-        INSERT INTO messages (
-            source_id, channel_id, external_id, author_id,
-            thread_root_external_id, reply_to_external_id,
-            content, content_raw, created_at, edited_at, metadata_json
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+    metadata_json = _json_dumps(metadata)
+    row = conn.execute(
+        _SQL_INSERT_MESSAGE,
         (
             source_id,
             channel_id,
@@ -325,15 +600,44 @@ def upsert_message(
             content_raw,
             created_at,
             edited_at,
-            _json_dumps(metadata),
+            metadata_json,
         ),
-    )
+    ).fetchone()
+    if row is not None:
+        return int(row["id"]), True, False
+
+    # Edits are snapshotted by the messages_version_on_edit trigger; any change
+    # beyond the updated row itself means it fired.
+    before = conn.total_changes
     row = conn.execute(
-        "SELECT id FROM messages WHERE source_id = ? AND external_id = ?",
-        (source_id, external_id),
+        _SQL_UPDATE_MESSAGE,
+        (
+            author_id,
+            content,
+            content_raw,
+            edited_at,
+            thread_root_external_id,
+            reply_to_external_id,
+            metadata_json,
+            source_id,
+            external_id,
+        ),
     ).fetchone()
-    conn.commit()
-    return int(row["id"]), True, edited
+    return int(row["id"]), False, conn.total_changes - before > 1
+
+
+def upsert_reactions_bulk(
+    conn: sqlite3.Connection,
+    rows: Iterable[Tuple[int, str, int, Optional[Dict[str, Any]]]],
+) -> None:
+    conn.executemany(
+        _SQL_UPSERT_REACTION,
+        [
+            # Missing metadata is stored as "{}", as it always has been.
+            (message_id, emoji, count, _json_dumps({} if metadata is None else metadata))
+            for message_id, emoji, count, metadata in rows
+        ],
+    )
 
 
 def upsert_reaction(
@@ -343,17 +647,7 @@ def upsert_reaction(
     count: int,
     metadata: Optional[Dict[str, Any]] = None,
 ) -> None:
-    conn.execute(
-        """
-        INSERT INTO reactions (message_id, emoji, count, metadata_json)
-        VALUES (?, ?, ?, ?)
-        ON CONFLICT(message_id, emoji) DO UPDATE SET
-            count = excluded.count,
-            metadata_json = excluded.metadata_json
-        """,
-        (message_id, emoji, count, _json_dumps(metadata)),
-    )
-    conn.commit()
+    upsert_reactions_bulk(conn, [(message_id, emoji, count, metadata)])
 
 
 def record_event(
@@ -363,22 +657,21 @@ def record_event(
     message_id: Optional[int],
     event_type: str,
     payload: Optional[Dict[str, Any]] = None,
+    now: Optional[str] = None,
 ) -> None:
-    conn.execute(
-        """
-        INSERT INTO events (source_id, channel_id, message_id, type, created_at, payload_json)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (
-            source_id,
-            channel_id,
-            message_id,
-            event_type,
-            datetime.utcnow().isoformat(),
-            _json_dumps(payload),
-        ),
+    record_events_bulk(
+        conn, [(source_id, channel_id, message_id, event_type, now or now_iso(), payload)]
     )
-    conn.commit()
+
+
+def record_events_bulk(
+    conn: sqlite3.Connection,
+    rows: Iterable[
+        Tuple[int, Optional[int], Optional[int], str, str, Optional[Dict[str, Any]]]
+    ],
+) -> None:
+    # Rows are (source_id, channel_id, message_id, type, created_at, payload).
+    conn.executemany(_SQL_INSERT_EVENT, [(*row[:-1], _json_dumps(row[-1])) for row in rows])
 
 
 def get_sync_state(
@@ -386,24 +679,19 @@ def get_sync_state(
     source_id: int,
     channel_id: int,
 ) -> sqlite3.Row:
-    row = conn.execute(
-        "SELECT * FROM sync_state WHERE source_id = ? AND channel_id = ?",
-        (source_id, channel_id),
-    ).fetchone()
+    row = conn.execute(_SQL_SYNC_STATE, (source_id, channel_id)).fetchone()
     if row:
         return row
     conn.execute(
-        """
-        INSERT INTO sync_state (source_id, channel_id, mode, updated_at)
-        VALUES (?, ?, ?, ?)
-        """,
-        (source_id, channel_id, "recent", datetime.utcnow().isoformat()),
+        _SQL_INSERT_SYNC_STATE,
+        (source_id, channel_id, "recent", now_iso()),
     )
-    conn.commit()
-    return conn.execute(
-        "SELECT * FROM sync_state WHERE source_id = ? AND channel_id = ?",
-        (source_id, channel_id),
-    ).fetchone()
+    return conn.execute(_SQL_SYNC_STATE, (source_id, channel_id)).fetchone()
+
+
+def get_sync_states(conn: sqlite3.Connection, source_id: int) -> Dict[int, sqlite3.Row]:
+    # Existing rows only; get_sync_state creates the default row for new channels.
+    return {row["channel_id"]: row for row in conn.execute(_SQL_SYNC_STATES, (source_id,))}
 
 
 def update_sync_state(
@@ -415,27 +703,18 @@ def update_sync_state(
     oldest_seen_at: Optional[str],
     cursor: Optional[Dict[str, Any]],
     idle_cycles: int,
+    now: Optional[str] = None,
 ) -> None:
     conn.execute(
-        """
-        UPDATE sync_state SET
-            mode = ?,
-            last_seen_at = ?,
-            oldest_seen_at = ?,
-            cursor_json = ?,
-            idle_cycles = ?,
-            updated_at = ?
-        WHERE source_id = ? AND channel_id = ?
-        """,
+        _SQL_UPDATE_SYNC_STATE,
         (
             mode,
             last_seen_at,
             oldest_seen_at,
             _json_dumps(cursor),
             idle_cycles,
-            datetime.utcnow().isoformat(),
+            now or now_iso(),
             source_id,
             channel_id,
         ),
     )
-    conn.commit()
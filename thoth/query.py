@@ -1,47 +1,127 @@
 import sqlite3
-from typing import List, Dict, Any
+from typing import Any, List, Optional, Sequence, Tuple
 
+from thoth import db
 
-def search_messages(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+Cursor = Tuple[Optional[str], int]
+
+
+def _fts_query(term: str) -> str:
+    # Quoted prefix tokens: "foo" also matches "foobar", as the LIKE search did.
+    tokens = term.split()
+    return " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+
+
+def search_messages(conn: sqlite3.Connection, query: str, limit: int = 10) -> List[sqlite3.Row]:
+    match = _fts_query(query)
+    if match and db.has_fts(conn):
+        rows = conn.execute(
+            """
+            WITH fts_matches AS (
+                SELECT rowid, bm25(messages_fts) AS score
+                FROM messages_fts
+                WHERE messages_fts MATCH ?
+                ORDER BY score
+                LIMIT ?
+            )
+            SELECT messages.content, messages.created_at, channels.name AS channel, sources.name AS source
+            FROM fts_matches
+            JOIN messages ON messages.id = fts_matches.rowid
+            JOIN channels ON channels.id = messages.channel_id
+            JOIN sources ON sources.id = messages.source_id
+            ORDER BY fts_matches.score
+            """,
+            (match, limit),
+        ).fetchall()
+        return rows
+    # The term is matched literally. Left-anchored patterns range-scan
+    # idx_messages_content_nocase; the full substring scan only fills whatever
+    # slots the prefix matches left over.
+    term = _escape_like(query)
+    rows = _like_search(conn, f"{term}%", limit)
+    if len(rows) >= limit:
+        return rows
+    seen = [row["id"] for row in rows]
+    return rows + _like_search(conn, f"%{term}%", limit - len(rows), seen)
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _like_search(
+    conn: sqlite3.Connection,
+    pattern: str,
+    limit: int,
+    exclude_ids: Sequence[int] = (),
+) -> List[sqlite3.Row]:
+    exclude = f"AND messages.id NOT IN ({', '.join('?' * len(exclude_ids))})" if exclude_ids else ""
     rows = conn.execute(
-        """
-        SELECT messages.content, messages.created_at, channels.name AS channel, sources.name AS source
+        f"""
+        SELECT messages.id, messages.content, messages.created_at,
+               channels.name AS channel, sources.name AS source
         FROM messages
         JOIN channels ON channels.id = messages.channel_id
         JOIN sources ON sources.id = messages.source_id
-        WHERE messages.content LIKE ?
+        WHERE messages.content LIKE ? ESCAPE '\\' {exclude}
         ORDER BY messages.created_at DESC
         LIMIT ?
         """,
-        (f"%{query}%", limit),
+        (pattern, *exclude_ids, limit),
     ).fetchall()
-    return [dict(row) for row in rows]
+    return rows
 
 
-def recent_activity(conn: sqlite3.Connection, limit: int = 5) -> List[Dict[str, Any]]:
-    rows = conn.execute(
-        """
-        SELECT messages.content, messages.created_at, channels.name AS channel, sources.name AS source
+def recent_activity(
+    conn: sqlite3.Connection,
+    limit: int = 5,
+    cursor: Optional[Cursor] = None,
+) -> Tuple[List[sqlite3.Row], Optional[Cursor]]:
+    """Return ``(rows, next_cursor)``: a page of the newest messages and the
+    cursor for the page after it, or None once a page comes back short."""
+    # Keyset pagination on (created_at, id). Rows without a created_at sort
+    # last; row-value comparisons never match NULL, so they are paged
+    # separately once the timestamped rows run out.
+    if cursor is not None and cursor[0] is None:
+        rows = _recent_rows(conn, "messages.created_at IS NULL AND messages.id < ?", (cursor[1],), limit)
+    else:
+        if cursor is None:
+            rows = _recent_rows(conn, "messages.created_at IS NOT NULL", (), limit)
+        else:
+            rows = _recent_rows(conn, "(messages.created_at, messages.id) < (?, ?)", cursor, limit)
+        if len(rows) < limit:
+            rows += _recent_rows(conn, "messages.created_at IS NULL", (), limit - len(rows))
+    next_cursor = (rows[-1]["created_at"], rows[-1]["id"]) if len(rows) == limit else None
+    return rows, next_cursor
+
+
+def _recent_rows(
+    conn: sqlite3.Connection, where: str, params: Sequence[Any], limit: int
+) -> List[sqlite3.Row]:
+    return conn.execute(
+        f"""
+        SELECT messages.id, messages.content, messages.created_at,
+               channels.name AS channel, sources.name AS source
         FROM messages
         JOIN channels ON channels.id = messages.channel_id
         JOIN sources ON sources.id = messages.source_id
-        ORDER BY messages.created_at DESC
+        WHERE {where}
+        ORDER BY messages.created_at DESC, messages.id DESC
         LIMIT ?
         """,
-        (limit,),
+        (*params, limit),
     ).fetchall()
-    return [dict(row) for row in rows]
 
 
-def channel_counts(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+def channel_counts(conn: sqlite3.Connection) -> List[sqlite3.Row]:
     rows = conn.execute(
         """
-        SELECT sources.name AS source, channels.name AS channel, COUNT(messages.id) AS message_count
-        FROM messages
-        JOIN channels ON channels.id = messages.channel_id
-        JOIN sources ON sources.id = messages.source_id
-        GROUP BY sources.name, channels.name
-        ORDER BY message_count DESC
+        SELECT sources.name AS source, channels.name AS channel, counts.count AS message_count
+        FROM channel_message_counts AS counts
+        JOIN channels ON channels.id = counts.channel_id
+        JOIN sources ON sources.id = channels.source_id
+        WHERE counts.count > 0
+        ORDER BY counts.count DESC
         """
     ).fetchall()
-    return [dict(row) for row in rows]
+    return rows
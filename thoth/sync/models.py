@@ -1,16 +1,13 @@
-from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, NamedTuple, Optional, Tuple
 
 
-@dataclass
-class ReactionData:
+class ReactionData(NamedTuple):
     emoji: str
     count: int
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
 
 
-@dataclass
-class MessageData:
+class MessageData(NamedTuple):
     external_id: str
     author: Optional[str]
     author_external_id: Optional[str]
@@ -20,5 +17,5 @@ class MessageData:
     edited_at: Optional[str]
     thread_root_external_id: Optional[str]
     reply_to_external_id: Optional[str]
-    reactions: List[ReactionData] = field(default_factory=list)
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    reactions: Tuple[ReactionData, ...] = ()
+    metadata: Optional[Dict[str, Any]] = None
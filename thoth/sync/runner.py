@@ -3,22 +3,43 @@ from __future__ import annotations
 import argparse
 import logging
 import hashlib
+import inspect
 import pathlib
 import re
-import sys
 import os
+import select
+import signal
+import sys
+import threading
 import time
+import types
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from functools import lru_cache, partial
 from typing import Any, Dict, Optional
-from urllib.parse import urljoin
 
-from playwright.sync_api import sync_playwright, Page
+from playwright.sync_api import (
+    sync_playwright,
+    CDPSession,
+    Error as PlaywrightError,
+    Locator,
+    Page,
+    TimeoutError as PlaywrightTimeoutError,
+)
 import sqlite3
 
 from thoth import config as config_module
 from thoth import db
 from thoth.sync.models import MessageData, ReactionData
 from thoth.sync import tasks as task_module
-from thoth.sync.utils import extract_messages, parse_timestamp, scroll_to_bottom, scroll_up
+from thoth.sync.utils import (
+    cdp_evaluate,
+    channel_links,
+    harvest_older_messages,
+    install_page_helpers,
+    parse_timestamp,
+    scroll_and_extract,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +50,15 @@ LOGIN_SELECTORS = {
 }
 
 DISCORD_BASE = "https://discord.com"
-
-
-def _normalize_discord_url(href: str) -> str:
-    return urljoin(DISCORD_BASE, href)
+# Guild is a snowflake or "@me" (DMs); channel is an optional snowflake.
+# Each id must end at a path, query or fragment boundary, so oversized ids and
+# trailing junk are rejected rather than truncated; a numeric segment that is
+# not a valid channel id fails the whole match instead of being dropped.
+DISCORD_CHANNELS_RE = re.compile(
+    r"/channels/(?P<guild>@me|\d{17,20})(?:/(?P<chan>\d{17,20}))?(?=[/?#]|$)(?(chan)|(?!/\d))"
+)
+# Images, fonts and media the scraper never reads; matched with or without a query string.
+BLOCKED_MEDIA_RE = re.compile(r"\.(?:png|jpe?g|gif|webp|avif|svg|ico|woff2?|ttf|otf|mp4|webm|mp3|ogg)(?:[?#]|$)", re.I)
 
 
 def _infer_guild_id_from_url(url: str) -> Optional[str]:
@@ -48,29 +74,53 @@ def _is_discord_dm_url(url: str) -> bool:
     return "/channels/@me" in (url or "")
 
 
-def _discord_sidebar_guild_ids(page: Page) -> list[str]:
-    return page.evaluate(
-        """
-        () => {
-          const ids = new Set();
-          const byData = Array.from(document.querySelectorAll("[data-list-item-id^='guildsnav___']"));
-          for (const el of byData) {
-            const raw = el.getAttribute("data-list-item-id") || "";
-            const id = raw.replace("guildsnav___", "");
-            if (/^\\d+$/.test(id)) ids.add(id);
-          }
-          const anchors = Array.from(document.querySelectorAll("nav[aria-label='Servers'] a[href*='/channels/']"));
-          for (const a of anchors) {
-            const href = a.getAttribute("href") || "";
-            const match = href.match(/\\/channels\\/([^/]+)/);
-            if (match && /^\\d+$/.test(match[1])) ids.add(match[1]);
-          }
-          return Array.from(ids);
-        }
-        """
+_DISCORD_SIDEBAR_GUILD_IDS_JS = """
+() => {
+  const ids = new Set();
+  const byData = Array.from(document.querySelectorAll("[data-list-item-id^='guildsnav___']"));
+  for (const el of byData) {
+    const raw = el.getAttribute("data-list-item-id") || "";
+    const id = raw.replace("guildsnav___", "");
+    if (/^\\d+$/.test(id)) ids.add(id);
+  }
+  const anchors = Array.from(document.querySelectorAll("nav[aria-label='Servers'] a[href*='/channels/']"));
+  for (const a of anchors) {
+    const href = a.getAttribute("href") || "";
+    const match = href.match(/\\/channels\\/([^/]+)/);
+    if (match && /^\\d+$/.test(match[1])) ids.add(match[1]);
+  }
+  return Array.from(ids);
+}
+"""
+
+
+def _discord_sidebar_guild_ids(page: Page, cdp: Optional[CDPSession] = None) -> list[str]:
+    if cdp is not None:
+        return cdp_evaluate(cdp, f"({_DISCORD_SIDEBAR_GUILD_IDS_JS})()")
+    return page.evaluate(_DISCORD_SIDEBAR_GUILD_IDS_JS)
+
+
+@lru_cache(maxsize=4096)
+def _discord_channel_selector(guild_id: str, channel_id: str) -> str:
+    return f"a[href*='/channels/{guild_id}/{channel_id}']"
+
+
+@lru_cache(maxsize=4096)
+def _discord_guild_nav_selector(guild_id: str) -> str:
+    return (
+        f"[data-list-item-id='guildsnav___{guild_id}'], "
+        f"nav[aria-label='Servers'] a[href*='/channels/{guild_id}']"
     )
 
 
+def _discord_channel_links(
+    page: Page, selector: str, wait_ms: int = 0, cdp: Optional[CDPSession] = None
+) -> list[dict]:
+    return channel_links(page, selector, DISCORD_BASE, wait_ms, cdp)
+
+
+# Called with the same channel URLs (and page.url) on every open; pure str -> str.
+@lru_cache(maxsize=8192)
 def _normalize_url(url: str) -> str:
     if not url:
         return ""
@@ -78,93 +128,91 @@ def _normalize_url(url: str) -> str:
     return base
 
 
-def _clean_label(value: str) -> str:
-    return " ".join((value or "").split()).strip()
-
-
 def _extract_discord_ids(href: str) -> Optional[tuple[str, str]]:
-    match = re.search(r"/channels/([^/]+)/([^/]+)", href)
-    if match:
-        return match.group(1), match.group(2)
-    match = re.search(r"/channels/([^/]+)$", href)
-    if match:
-        return match.group(1), ""
-    return None
+    match = DISCORD_CHANNELS_RE.search(href)
+    if not match:
+        return None
+    return match["guild"], match["chan"] or ""
 
 
 def discover_discord_channels(page: Page, base_url: str) -> list[dict]:
+    # One raw CDP session carries every helper call of the pass; page.evaluate
+    # remains the fallback if the session cannot be opened.
+    try:
+        cdp: Optional[CDPSession] = page.context.new_cdp_session(page)
+    except Exception:  # noqa: BLE001
+        cdp = None
+    try:
+        return _discover_discord_channels(page, base_url, cdp)
+    finally:
+        if cdp is not None:
+            try:
+                cdp.detach()
+            except Exception:  # noqa: BLE001
+                pass
+
+
+def _discover_discord_channels(page: Page, base_url: str, cdp: Optional[CDPSession]) -> list[dict]:
     if "discord.com/channels" not in page.url:
         page.goto(base_url, wait_until="domcontentloaded")
     try:
         page.wait_for_selector("nav[aria-label='Servers']", timeout=15000)
     except Exception:  # noqa: BLE001
         LOGGER.warning("Discord discovery: server list not found on %s", page.url)
-    page.wait_for_timeout(1500)
+    try:
+        page.wait_for_selector("[data-list-item-id^='guildsnav___']", timeout=5000)
+    except Exception:  # noqa: BLE001
+        LOGGER.info("Discord discovery: no guild entries rendered on %s", page.url)
 
-    guild_ids = set(_discord_sidebar_guild_ids(page))
+    # Already deduped in-page and in sidebar order, which is the order we visit them.
+    guild_ids = _discord_sidebar_guild_ids(page, cdp)
     LOGGER.info("Discord discovery: %d server IDs from sidebar", len(guild_ids))
 
-    channels: list[dict] = []
-    seen_urls: set[str] = set()
-
-    def collect_channels_for_guild(guild_id: str) -> None:
-        channel_links = page.evaluate(
-            """
-            (guildId) => Array.from(document.querySelectorAll(`a[href*='/channels/${guildId}/']`))
-              .map(el => ({
-                href: el.getAttribute('href') || '',
-                text: (el.innerText || '').trim(),
-                aria: el.getAttribute('aria-label') || ''
-              }))
-            """,
-            guild_id,
-        )
+    # Insertion-ordered, keyed on the (guild_id, channel_id) pair.
+    channels: dict[tuple[str, str], dict] = {}
+
+    def add_channels(records: list[dict]) -> None:
+        for record in records:
+            ids = _extract_discord_ids(record["url"])
+            if not ids or ids in channels:
+                continue
+            # Store one canonical URL per channel whatever href form Discord rendered.
+            path = f"/channels/{ids[0]}/{ids[1]}" if ids[1] else f"/channels/{ids[0]}"
+            record["guild_id"], record["channel_id"] = ids
+            record["url"] = f"{DISCORD_BASE}{path}"
+            channels[ids] = record
+
+    def collect_channels_for_guild(guild_id: str, wait_ms: int = 0) -> None:
+        # One round-trip: waits in-page for the guild's links, then returns them.
+        records = _discord_channel_links(page, f"a[href*='/channels/{guild_id}/']", wait_ms, cdp)
+        if wait_ms and not records:
+            LOGGER.warning("Discord discovery: no channel links found for %s", guild_id)
         LOGGER.info(
             "Discord discovery: %d channel links found for guild %s",
-            len(channel_links),
+            len(records),
             guild_id,
         )
-        for link in channel_links:
-            href = link.get("href") or ""
-            ids = _extract_discord_ids(href)
-            if not ids:
-                continue
-            url = _normalize_discord_url(href)
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            name = _clean_label(link.get("text") or link.get("aria") or f"channel-{ids[1]}")
-            channels.append(
-                {"name": name, "url": url, "guild_id": ids[0], "channel_id": ids[1]}
-            )
+        add_channels(records)
 
     # Collect DMs from @me if visible
     try:
         home_link = page.locator("a[href='/channels/@me']")
         if home_link.count() > 0:
             home_link.first.click()
-            page.wait_for_timeout(1200)
-            collect_channels_for_guild("@me")
+            collect_channels_for_guild("@me", wait_ms=5000)
     except Exception:  # noqa: BLE001
         pass
 
-    for guild_id in sorted(guild_ids):
+    for guild_id in guild_ids:
         if guild_id == "@me":
             continue
         try:
-            selector = f"[data-list-item-id='guildsnav___{guild_id}'], nav[aria-label='Servers'] a[href*='/channels/{guild_id}']"
-            locator = page.locator(selector)
+            locator = page.locator(_discord_guild_nav_selector(guild_id))
             if locator.count() > 0:
                 locator.first.click()
-                page.wait_for_timeout(1400)
             else:
                 page.goto(f"{DISCORD_BASE}/channels/{guild_id}", wait_until="domcontentloaded")
-                page.wait_for_timeout(1400)
-            try:
-                page.wait_for_selector(f"a[href*='/channels/{guild_id}/']", timeout=10000)
-            except Exception:  # noqa: BLE001
-                LOGGER.warning("Discord discovery: no channel links found for %s", guild_id)
-            collect_channels_for_guild(guild_id)
+            collect_channels_for_guild(guild_id, wait_ms=10000)
         except Exception:  # noqa: BLE001
             LOGGER.warning("Discord discovery: failed to open guild %s", guild_id)
             continue
@@ -178,82 +226,131 @@ def discover_discord_channels(page: Page, base_url: str) -> list[dict]:
         else:
             LOGGER.warning("Discord discovery: no guild IDs found in sidebar or URL.")
     if not channels:
-        raw_links = page.evaluate(
-            """
-            () => Array.from(document.querySelectorAll("a[href*='/channels/']"))
-              .map(el => ({
-                href: el.getAttribute('href') || '',
-                text: (el.innerText || '').trim(),
-                aria: el.getAttribute('aria-label') || ''
-              }))
-            """
-        )
-        LOGGER.info("Discord discovery fallback: %d channel links visible", len(raw_links))
-        for link in raw_links:
-            href = link.get("href") or ""
-            ids = _extract_discord_ids(href)
-            if not ids:
-                continue
-            url = _normalize_discord_url(href)
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            name = _clean_label(link.get("text") or link.get("aria") or f"channel-{ids[1]}")
-            channels.append(
-                {"name": name, "url": url, "guild_id": ids[0], "channel_id": ids[1]}
-            )
-
-    return channels
+        records = _discord_channel_links(page, "a[href*='/channels/']", cdp=cdp)
+        LOGGER.info("Discord discovery fallback: %d channel links visible", len(records))
+        add_channels(records)
+
+    return list(channels.values())
+
+
+def _message_from_raw(raw: Dict[str, Any]) -> MessageData:
+    raw_get = raw.get
+    raw_timestamp = raw_get("raw_timestamp")
+    author = raw_get("author")
+    content = raw_get("content")
+    timestamp = raw_get("timestamp") or parse_timestamp(raw_timestamp)
+    external_id = raw_get("external_id")
+    if not external_id:
+        fallback = f"{raw_timestamp}|{author}|{content}"
+        external_id = f"fallback:{hashlib.sha1(fallback.encode('utf-8')).hexdigest()}"
+    return MessageData(
+        external_id=str(external_id),
+        thread_root_external_id=None,
+        reply_to_external_id=None,
+        content=content,
+        content_raw=raw_get("content_raw"),
+        created_at=timestamp,
+        edited_at=timestamp if raw_get("edited") else None,
+        author=author,
+        author_external_id=author,
+        reactions=tuple(
+            ReactionData(reaction.get("emoji", "?"), reaction.get("count", 1))
+            for reaction in raw_get("reactions", ())
+        ),
+        # Content, author and reactions already have their own columns/tables.
+        metadata={
+            "raw_timestamp": raw_timestamp,
+            "edited": bool(raw_get("edited")),
+            "reply_context": raw_get("reply_context"),
+        },
+    )
 
 
 class GenericScraper:
     def __init__(self, source_type: str, selectors: Dict[str, str]):
         self.source_type = source_type
         self.selectors = selectors
+        self._login_selector = LOGIN_SELECTORS.get(source_type)
+        self._login_locators: weakref.WeakKeyDictionary[Page, Locator] = weakref.WeakKeyDictionary()
+        self._login_navigation_pending = False
+        self._helper_pages: weakref.WeakSet[Page] = weakref.WeakSet()
+
+    def install_helpers(self, page: Page) -> None:
+        # Selectors are stored in-page once, so later calls ship no selector dict.
+        install_page_helpers(page, self.selectors)
+        self._helper_pages.add(page)
+
+    def _page_selectors(self, page: Page) -> Optional[Dict[str, str]]:
+        return None if page in self._helper_pages else self.selectors
+
+    def _login_locator(self, page: Page) -> Optional[Locator]:
+        if not self._login_selector:
+            return None
+        locator = self._login_locators.get(page)
+        if locator is None:
+            # Locators re-resolve on every use, so one per page survives navigations.
+            locator = page.locator(self._login_selector).first
+            self._login_locators[page] = locator
+        return locator
 
     def login_screen_visible(self, page: Page) -> bool:
-        login_selector = LOGIN_SELECTORS.get(self.source_type)
-        if not login_selector:
+        locator = self._login_locator(page)
+        if locator is None:
             return False
-        return bool(page.query_selector(login_selector))
+        return locator.count() > 0
 
     def login_required(self, page: Page, base_url: str) -> bool:
-        login_selector = LOGIN_SELECTORS.get(self.source_type)
-        if not login_selector:
+        self.start_login_check(page, base_url)
+        return self.finish_login_check(page)
+
+    def start_login_check(self, page: Page, base_url: str) -> None:
+        # Returns once the navigation commits so other tabs can start loading.
+        # A tab already inside the source (e.g. a restored session) is checked in place.
+        self._login_navigation_pending = False
+        if not self._login_selector:
+            return
+        if _normalize_url(page.url).startswith(_normalize_url(base_url)):
+            return
+        page.goto(base_url, wait_until="commit")
+        self._login_navigation_pending = True
+
+    def finish_login_check(self, page: Page) -> bool:
+        locator = self._login_locator(page)
+        if locator is None:
             return False
-        page.goto(base_url, wait_until="load")
-        page.wait_for_timeout(1000)
-        return bool(page.query_selector(login_selector))
+        if self._login_navigation_pending:
+            self._login_navigation_pending = False
+            page.wait_for_load_state("load")
+            # SPAs render the login form after load; return as soon as it shows.
+            try:
+                locator.wait_for(state="attached", timeout=1000)
+            except PlaywrightTimeoutError:
+                return False
+            return True
+        return locator.count() > 0
 
     def wait_for_login(self, page: Page, timeout_seconds: int = 60) -> bool:
-        login_selector = LOGIN_SELECTORS.get(self.source_type)
-        if not login_selector:
+        locator = self._login_locator(page)
+        if locator is None:
             return True
-        if not sys.stdin.isatty():
-            LOGGER.warning(
-                "Login required for %s. Waiting for user login in the browser.",
-                self.source_type,
-            )
-            last_log = time.monotonic()
-            deadline = time.monotonic() + timeout_seconds
-            while page.query_selector(login_selector) and time.monotonic() < deadline:
-                page.wait_for_timeout(2000)
-                if time.monotonic() - last_log > 30:
-                    LOGGER.warning(
-                        "Still waiting on %s login. Please authenticate in the browser.",
-                        self.source_type,
-                    )
-                    last_log = time.monotonic()
-        else:
-            deadline = time.monotonic() + timeout_seconds
-            while page.query_selector(login_selector) and time.monotonic() < deadline:
+        LOGGER.warning(
+            "Login required for %s. Waiting for user login in the browser.",
+            self.source_type,
+        )
+        # Let Playwright watch for the login form to go away instead of blocking on stdin.
+        deadline = time.monotonic() + timeout_seconds
+        while locator.count() > 0:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            try:
+                locator.wait_for(state="detached", timeout=min(remaining_ms, 30000))
+            except PlaywrightTimeoutError:
                 LOGGER.warning(
-                    "Login required for %s. Please authenticate in the browser.",
+                    "Still waiting on %s login. Please authenticate in the browser.",
                     self.source_type,
                 )
-                input("Press Enter after completing login to re-check...")
-                page.wait_for_timeout(1000)
-        if page.query_selector(login_selector):
+        if locator.count() > 0:
             LOGGER.warning("Login still pending for %s. Skipping for now.", self.source_type)
             return False
         ready_selector = self.selectors.get("message_item")
@@ -268,56 +365,45 @@ class GenericScraper:
         if self.source_type == "discord":
             ids = _extract_discord_ids(url)
             if ids:
-                selector = f"a[href*='/channels/{ids[0]}/{ids[1]}']"
-                locator = page.locator(selector)
+                locator = page.locator(_discord_channel_selector(*ids))
                 if locator.count() > 0:
                     locator.first.click()
-                    page.wait_for_timeout(1000)
-                    login_selector = LOGIN_SELECTORS.get(self.source_type)
-                    if login_selector and page.query_selector(login_selector):
+                    channel_path = f"/channels/{ids[0]}/{ids[1]}"
+                    try:
+                        page.wait_for_url(lambda current: channel_path in current, timeout=5000)
+                    except Exception:  # noqa: BLE001
+                        LOGGER.info("Channel URL did not update after click for %s", url)
+                    if self.login_screen_visible(page):
                         self.wait_for_login(page)
                     return
         if _normalize_url(page.url) != _normalize_url(url):
             page.goto(url, wait_until="domcontentloaded")
-            page.wait_for_timeout(1000)
-        login_selector = LOGIN_SELECTORS.get(self.source_type)
-        if login_selector and page.query_selector(login_selector):
+        if self.login_screen_visible(page):
             self.wait_for_login(page)
 
-    def collect_messages(self, page: Page) -> Dict[str, Any]:
-        raw_messages = extract_messages(page, self.selectors)
-        parsed = []
-        for raw in raw_messages:
-            timestamp = parse_timestamp(raw.get("raw_timestamp"))
-            external_id = raw.get("external_id")
-            if not external_id:
-                fallback = f"{raw.get('raw_timestamp')}|{raw.get('author')}|{raw.get('content')}"
-                external_id = f"fallback:{hashlib.sha1(fallback.encode('utf-8')).hexdigest()}"
-            msg = MessageData(
-                external_id=str(external_id),
-                author=raw.get("author"),
-                author_external_id=raw.get("author"),
-                content=raw.get("content"),
-                content_raw=raw.get("content_raw"),
-                created_at=timestamp,
-                edited_at=timestamp if raw.get("edited") else None,
-                thread_root_external_id=None,
-                reply_to_external_id=None,
-                reactions=[
-                    ReactionData(
-                        emoji=reaction.get("emoji", "?"),
-                        count=reaction.get("count", 1),
-                    )
-                    for reaction in raw.get("reactions", [])
-                ],
-                metadata={
-                    "raw": raw,
-                    "reply_context": raw.get("reply_context"),
-                },
-            )
-            if msg.external_id:
-                parsed.append(msg)
-        return {"messages": parsed}
+    def collect_recent_messages(self, page: Page, limit: Optional[int], settle_ms: int) -> Dict[str, Any]:
+        # Scroll to the newest messages and read them in the same evaluate.
+        raw_messages = scroll_and_extract(
+            page, self._page_selectors(page), self.selectors.get("scroll_container"), settle_ms, limit
+        )
+        return {"messages": [_message_from_raw(raw) for raw in raw_messages]}
+
+    def collect_older_messages(
+        self,
+        page: Page,
+        steps: int,
+        pixels: int,
+        delay_ms: int,
+    ) -> Dict[str, Any]:
+        raw_messages = harvest_older_messages(
+            page,
+            self._page_selectors(page),
+            self.selectors.get("scroll_container"),
+            steps,
+            pixels,
+            delay_ms,
+        )
+        return {"messages": [_message_from_raw(raw) for raw in raw_messages]}
 
 
 def ingest_messages(
@@ -325,55 +411,83 @@ def ingest_messages(
     source_id: int,
     channel_id: int,
     messages: list[MessageData],
+    author_cache: Optional[Dict[str, int]] = None,
 ) -> Dict[str, int]:
-    inserted = 0
-    edited = 0
-    for msg in messages:
-        author_id = None
-        if msg.author_external_id:
-            author_id = db.upsert_user(
+    # Last occurrence wins, matching what row-by-row upserts would leave behind.
+    batch = {msg.external_id: msg for msg in messages}
+    existing = db.fetch_message_states(conn, source_id, list(batch))
+    now = db.now_iso()
+    # Pass one author_cache across calls to skip authors already upserted this pass.
+    author_ids = author_cache if author_cache is not None else {}
+    new_authors = {
+        msg.author_external_id: msg.author
+        for msg in batch.values()
+        if msg.author_external_id and msg.author_external_id not in author_ids
+    }
+    if new_authors:
+        author_ids.update(
+            db.upsert_users_bulk(
                 conn,
-                source_id=source_id,
-                external_id=msg.author_external_id,
-                handle=None,
-                display_name=msg.author,
+                source_id,
+                [(external_id, None, name, None) for external_id, name in new_authors.items()],
             )
-        message_id, created, was_edited = db.upsert_message(
-            conn,
-            source_id=source_id,
-            channel_id=channel_id,
-            external_id=msg.external_id,
-            author_id=author_id,
-            content=msg.content,
-            content_raw=msg.content_raw,
-            created_at=msg.created_at,
-            edited_at=msg.edited_at,
-            thread_root_external_id=msg.thread_root_external_id,
-            reply_to_external_id=msg.reply_to_external_id,
-            metadata=msg.metadata,
         )
-        if created:
-            inserted += 1
-        if was_edited:
-            edited += 1
-            db.record_event(
-                conn,
-                source_id=source_id,
-                channel_id=channel_id,
-                message_id=message_id,
-                event_type="message.edited",
-                payload={"external_id": msg.external_id},
+    message_rows: list[tuple] = []
+    edited_ids: list[tuple[int, str]] = []
+    for external_id, msg in batch.items():
+        author_id = author_ids.get(msg.author_external_id) if msg.author_external_id else None
+        message_rows.append(
+            (
+                source_id,
+                channel_id,
+                external_id,
+                author_id,
+                msg.thread_root_external_id,
+                msg.reply_to_external_id,
+                msg.content,
+                msg.content_raw,
+                msg.created_at,
+                msg.edited_at,
+                msg.metadata,
             )
-        for reaction in msg.reactions:
-            if reaction.emoji:
-                db.upsert_reaction(
-                    conn,
-                    message_id=message_id,
-                    emoji=reaction.emoji,
-                    count=reaction.count,
-                    metadata=reaction.metadata,
-                )
-    return {"inserted": inserted, "edited": edited}
+        )
+        previous = existing.get(external_id)
+        # Mirrors the COALESCE upsert and the messages_version_on_edit trigger:
+        # a missing value keeps the stored one, so it is not an edit.
+        if previous is not None and (
+            (msg.content is not None and previous["content"] != msg.content)
+            or (msg.content_raw is not None and previous["content_raw"] != msg.content_raw)
+        ):
+            edited_ids.append((int(previous["id"]), external_id))
+
+    db.upsert_messages_bulk(conn, message_rows, existing)
+    new_ids = [external_id for external_id in batch if external_id not in existing]
+    message_ids = {external_id: int(row["id"]) for external_id, row in existing.items()}
+    message_ids.update(
+        (external_id, int(row["id"]))
+        for external_id, row in db.fetch_message_states(conn, source_id, new_ids).items()
+    )
+    db.record_events_bulk(
+        conn,
+        [
+            (source_id, channel_id, message_id, "message.edited", now, {"external_id": external_id})
+            for message_id, external_id in edited_ids
+        ],
+    )
+    db.upsert_reactions_bulk(
+        conn,
+        [
+            (message_ids[external_id], reaction.emoji, reaction.count, reaction.metadata)
+            for external_id, msg in batch.items()
+            for reaction in msg.reactions
+            if reaction.emoji
+        ],
+    )
+    return {"inserted": len(new_ids), "edited": len(edited_ids)}
+
+
+# One writer thread shared by every channel sync, rather than a pool per channel.
+_DB_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thoth-db")
 
 
 def sync_channel(
@@ -385,13 +499,17 @@ def sync_channel(
     channel_url: str,
     scrape_config: Dict[str, Any],
     label: str,
+    state: Optional[sqlite3.Row] = None,
 ) -> dict:
-    state = db.get_sync_state(conn, source_id, channel_id)
+    if state is None:
+        state = db.get_sync_state(conn, source_id, channel_id)
     mode = state["mode"] or "recent"
     idle_cycles = int(state["idle_cycles"] or 0)
     last_seen_at = state["last_seen_at"]
     oldest_seen_at = state["oldest_seen_at"]
 
+    # Scrape outside any transaction: BEGIN IMMEDIATE takes the write lock, so
+    # transactions only wrap the database writes, never browser waits.
     scraper.open_channel(page, channel_url)
     ready_selector = scraper.selectors.get("message_item")
     if ready_selector:
@@ -399,64 +517,79 @@ def sync_channel(
             page.wait_for_selector(ready_selector, timeout=30000)
         except Exception:  # noqa: BLE001
             LOGGER.info("Ready selector not found for %s; continuing.", channel_url)
-    scroll_container = scraper.selectors.get("scroll_container")
-    scroll_to_bottom(page, scroll_container)
-    page.wait_for_timeout(int(scrape_config.get("scroll_delay_ms", 1000)))
-
-    recent_data = scraper.collect_messages(page)
     recent_limit = int(scrape_config.get("recent_message_limit", 200))
-    recent_messages = recent_data["messages"][-recent_limit:]
+    settle_ms = int(scrape_config.get("scroll_delay_ms", 1000))
+    recent_messages = scraper.collect_recent_messages(page, recent_limit, settle_ms)["messages"]
     if not recent_messages:
         LOGGER.warning(
             "No messages extracted for %s. Check login status and selectors.",
             label,
         )
-    recent_results = ingest_messages(conn, source_id, channel_id, recent_messages)
+    author_cache: Dict[str, int] = {}
+    seen_external_ids = {msg.external_id for msg in recent_messages}
+    steps = int(scrape_config.get("backfill_scroll_steps", 4))
+    pixels = int(scrape_config.get("scroll_pixels", 1200))
+    delay = int(scrape_config.get("scroll_delay_ms", 1500))
+    older_data = None
+
+    def ingest_recent() -> Dict[str, int]:
+        with db.transaction(conn):
+            return ingest_messages(conn, source_id, channel_id, recent_messages, author_cache)
+
+    # The writer thread is the only one touching conn until the write finishes,
+    # so a channel already in backfill scrolls while the recent batch is written.
+    recent_future = _DB_WRITER.submit(ingest_recent)
+    try:
+        if mode == "backfill":
+            older_data = scraper.collect_older_messages(page, steps, pixels, delay)
+    finally:
+        # Even if scrolling fails, conn is not handed back while the write runs.
+        wait_futures([recent_future])
+    recent_results = recent_future.result()
     if recent_results["inserted"] == 0:
         idle_cycles += 1
     else:
         idle_cycles = 0
 
-    timestamps = [msg.created_at for msg in recent_messages if msg.created_at]
-    if timestamps:
-        last_seen_at = max(timestamps)
+    last_seen_at = max(
+        (msg.created_at for msg in recent_messages if msg.created_at), default=last_seen_at
+    )
 
     idle_threshold = int(scrape_config.get("idle_cycles_before_backfill", 6))
     if mode == "recent" and idle_cycles >= idle_threshold:
         mode = "backfill"
         idle_cycles = 0
 
+    fresh = []
     if mode == "backfill":
-        steps = int(scrape_config.get("backfill_scroll_steps", 4))
-        pixels = int(scrape_config.get("scroll_pixels", 1200))
-        delay = int(scrape_config.get("scroll_delay_ms", 1500))
-        backfill_timestamps = []
-        backfill_inserted = 0
-        backfill_edited = 0
-        for _ in range(steps):
-            scroll_up(page, scroll_container, pixels)
-            page.wait_for_timeout(delay)
-            data = scraper.collect_messages(page)
-            results = ingest_messages(conn, source_id, channel_id, data["messages"])
-            backfill_inserted += results["inserted"]
-            backfill_edited += results["edited"]
-            backfill_timestamps.extend([msg.created_at for msg in data["messages"] if msg.created_at])
-        if backfill_timestamps:
-            oldest_seen_at = min(backfill_timestamps)
-    else:
-        backfill_inserted = 0
-        backfill_edited = 0
+        # One in-page harvest covers every scroll step; see harvest_older_messages.
+        if older_data is None:
+            older_data = scraper.collect_older_messages(page, steps, pixels, delay)
+        older_messages = older_data["messages"]
+        fresh = [msg for msg in older_messages if msg.external_id not in seen_external_ids]
+        # The watermark covers everything harvested, including re-seen messages.
+        oldest_seen_at = min(
+            (msg.created_at for msg in older_messages if msg.created_at), default=oldest_seen_at
+        )
 
-    db.update_sync_state(
-        conn,
-        source_id=source_id,
-        channel_id=channel_id,
-        mode=mode,
-        last_seen_at=last_seen_at,
-        oldest_seen_at=oldest_seen_at,
-        cursor={"mode": mode, "idle_cycles": idle_cycles},
-        idle_cycles=idle_cycles,
-    )
+    with db.transaction(conn):
+        if fresh:
+            results = ingest_messages(conn, source_id, channel_id, fresh, author_cache)
+            backfill_inserted = results["inserted"]
+            backfill_edited = results["edited"]
+        else:
+            backfill_inserted = 0
+            backfill_edited = 0
+        db.update_sync_state(
+            conn,
+            source_id=source_id,
+            channel_id=channel_id,
+            mode=mode,
+            last_seen_at=last_seen_at,
+            oldest_seen_at=oldest_seen_at,
+            cursor={"mode": mode, "idle_cycles": idle_cycles},
+            idle_cycles=idle_cycles,
+        )
     LOGGER.info(
         "Sync success %s mode=%s inserted=%d edited=%d backfill_inserted=%d backfill_edited=%d",
         label,
@@ -493,7 +626,12 @@ def prepare_session(
         slow_mo=config.slow_mo_ms,
         viewport=None,
         args=["--start-maximized"],
+        # run_forever owns SIGINT and closes the context itself; without this the
+        # driver, which shares our process group, closes the browser mid-cycle.
+        handle_sigint=False,
     )
+    if config.scrape.get("block_media", True):
+        context.route(BLOCKED_MEDIA_RE, lambda route: route.abort())
 
     enabled_sources = [source for source in config.sources if source.enabled]
     if not enabled_sources:
@@ -502,15 +640,20 @@ def prepare_session(
     scrapers_by_source: Dict[str, GenericScraper] = {}
 
     existing_pages = list(context.pages)
-    login_needed = []
     for index, source in enumerate(enabled_sources):
         page = existing_pages[index] if index < len(existing_pages) else context.new_page()
         pages_by_source[source.name] = page
-        scraper = GenericScraper(source.type, source.selectors)
+        scraper = GenericScraper(source.type, dict(source.selectors))
         scrapers_by_source[source.name] = scraper
+        scraper.install_helpers(page)
         page.bring_to_front()
-        if scraper.login_required(page, source.base_url):
-            login_needed.append(source.name)
+        scraper.start_login_check(page, source.base_url)
+    # Every tab is loading by now, so these waits overlap instead of adding up.
+    login_needed = [
+        source.name
+        for source in enabled_sources
+        if scrapers_by_source[source.name].finish_login_check(pages_by_source[source.name])
+    ]
 
     if login_needed:
         LOGGER.warning(
@@ -532,6 +675,106 @@ def _handle_prepare_error(exc: Exception) -> None:
     raise
 
 
+def _is_target_closed(exc: Exception) -> bool:
+    # TargetClosedError is not re-exported from playwright.sync_api, so match
+    # its class name; plain Errors from older drivers still carry the message.
+    if isinstance(exc, PlaywrightError) and type(exc).__name__ == "TargetClosedError":
+        return True
+    return "Target closed" in str(exc)
+
+
+def _login_pending_action() -> dict:
+    return {"status": "pending", "details": "login screen visible"}
+
+
+def _login_status_check(page: Page, scraper: GenericScraper, details: str) -> dict:
+    if scraper.login_screen_visible(page):
+        return {"status": "login_pending", "details": "login required"}
+    return {"status": "ok", "details": details}
+
+
+def _queue_channel_sync(
+    queue: task_module.TaskQueue,
+    conn: sqlite3.Connection,
+    scrape_config: Dict[str, Any],
+    page: Page,
+    scraper: GenericScraper,
+    source_name: str,
+    source_id: int,
+    channel_id: int,
+    channel_name: str,
+    channel_url: str,
+    state: sqlite3.Row,
+) -> None:
+    mode = state["mode"] or "recent"
+    reason = "read recent activity" if mode == "recent" else "backfill backlog"
+    queue.add(
+        task_module.Task(
+            name="sync_channel",
+            source=source_name,
+            channel=channel_name,
+            reason=reason,
+            action=partial(
+                sync_channel,
+                page,
+                scraper,
+                conn,
+                source_id,
+                channel_id,
+                channel_url,
+                scrape_config,
+                f"{source_name}:{channel_name}",
+                state,
+            ),
+        )
+    )
+
+
+def _discover_and_queue_channels(
+    queue: task_module.TaskQueue,
+    conn: sqlite3.Connection,
+    scrape_config: Dict[str, Any],
+    page: Page,
+    scraper: GenericScraper,
+    base_url: str,
+    source_name: str,
+    source_id: int,
+) -> dict:
+    if scraper.login_screen_visible(page):
+        return {"status": "login_pending", "details": "login required"}
+    discovered = discover_discord_channels(page, base_url)
+    with db.transaction(conn):
+        states = db.get_sync_states(conn, source_id)
+        for item in discovered:
+            channel_id = db.upsert_channel(
+                conn,
+                source_id=source_id,
+                name=item["name"],
+                external_id=item["url"],
+                url=item["url"],
+                metadata={"guild_id": item.get("guild_id"), "channel_id": item.get("channel_id")},
+            )
+            state = states.get(channel_id) or db.get_sync_state(conn, source_id, channel_id)
+            _queue_channel_sync(
+                queue,
+                conn,
+                scrape_config,
+                page,
+                scraper,
+                source_name,
+                source_id,
+                channel_id,
+                item["name"],
+                item["url"],
+                state,
+            )
+
+    return {
+        "status": "ok",
+        "details": f"discovered_channels={len(discovered)}",
+    }
+
+
 def run_cycle(
     conn: sqlite3.Connection,
     config: config_module.ThothConfig,
@@ -558,32 +801,18 @@ def run_cycle(
                     source=source.name,
                     channel=None,
                     reason="login screen visible; waiting for user authentication",
-                    action=lambda: {"status": "pending", "details": "login screen visible"},
+                    action=_login_pending_action,
                 )
             )
             continue
 
-        def notification_action(page=page, scraper=scraper):
-            needs_login = scraper.login_screen_visible(page)
-            if needs_login:
-                return {"status": "login_pending", "details": "login required"}
-            page.wait_for_timeout(500)
-            return {"status": "ok", "details": "checked notifications"}
-
-        def server_check_action(page=page, scraper=scraper):
-            needs_login = scraper.login_screen_visible(page)
-            if needs_login:
-                return {"status": "login_pending", "details": "login required"}
-            page.wait_for_timeout(500)
-            return {"status": "ok", "details": "checked server list"}
-
         queue.add(
             task_module.Task(
                 name="check_notifications",
                 source=source.name,
                 channel=None,
                 reason="periodic check for unread activity",
-                action=notification_action,
+                action=partial(_login_status_check, page, scraper, "checked notifications"),
             )
         )
         queue.add(
@@ -592,7 +821,7 @@ def run_cycle(
                 source=source.name,
                 channel=None,
                 reason="ensure source is responsive before channel sync",
-                action=server_check_action,
+                action=partial(_login_status_check, page, scraper, "checked server list"),
             )
         )
 
@@ -616,38 +845,21 @@ def run_cycle(
                         len(existing),
                         source.name,
                     )
+                    states = db.get_sync_states(conn, source_id)
                     for row in existing:
-                        state = db.get_sync_state(conn, source_id, row["id"])
-                        mode = state["mode"] or "recent"
-                        reason = "read recent activity" if mode == "recent" else "backfill backlog"
-
-                        def make_sync_action(
-                            page=page,
-                            scraper=scraper,
-                            source_id=source_id,
-                            channel_id=row["id"],
-                            channel_url=row["url"],
-                            label=f"{source.name}:{row['name']}",
-                        ):
-                            return sync_channel(
-                                page,
-                                scraper,
-                                conn,
-                                source_id,
-                                channel_id,
-                                channel_url,
-                                config.scrape,
-                                label,
-                            )
-
-                        queue.add(
-                            task_module.Task(
-                                name="sync_channel",
-                                source=source.name,
-                                channel=row["name"],
-                                reason=reason,
-                                action=make_sync_action,
-                            )
+                        state = states.get(row["id"]) or db.get_sync_state(conn, source_id, row["id"])
+                        _queue_channel_sync(
+                            queue,
+                            conn,
+                            config.scrape,
+                            page,
+                            scraper,
+                            source.name,
+                            source_id,
+                            row["id"],
+                            row["name"],
+                            row["url"],
+                            state,
                         )
                     continue
 
@@ -660,123 +872,60 @@ def run_cycle(
                 "No enabled channels for source %s. Auto-discovering Discord channels.",
                 source.name,
             )
-
-            def discovery_action(
-                page=page,
-                scraper=scraper,
-                base_url=source.base_url,
-                source_name=source.name,
-                source_id=source_id,
-            ):
-                if scraper.login_screen_visible(page):
-                    return {"status": "login_pending", "details": "login required"}
-                discovered = discover_discord_channels(page, base_url)
-                for item in discovered:
-                    channel_id = db.upsert_channel(
-                        conn,
-                        source_id=source_id,
-                        name=item["name"],
-                        external_id=item["url"],
-                        url=item["url"],
-                        metadata={"guild_id": item.get("guild_id"), "channel_id": item.get("channel_id")},
-                    )
-                    state = db.get_sync_state(conn, source_id, channel_id)
-                    mode = state["mode"] or "recent"
-                    reason = "read recent activity" if mode == "recent" else "backfill backlog"
-
-                    def make_sync_action(
-                        page=page,
-                        scraper=scraper,
-                        source_id=source_id,
-                        channel_id=channel_id,
-                        channel_url=item["url"],
-                        label=f"{source_name}:{item['name']}",
-                    ):
-                        return sync_channel(
-                            page,
-                            scraper,
-                            conn,
-                            source_id,
-                            channel_id,
-                            channel_url,
-                            config.scrape,
-                            label,
-                        )
-
-                    queue.add(
-                        task_module.Task(
-                            name="sync_channel",
-                            source=source_name,
-                            channel=item["name"],
-                            reason=reason,
-                            action=make_sync_action,
-                        )
-                    )
-
-                return {
-                    "status": "ok",
-                    "details": f"discovered_channels={len(discovered)}",
-                }
-
             queue.add(
                 task_module.Task(
                     name="discover_channels",
                     source=source.name,
                     channel=None,
                     reason="no channels configured; auto-discover all visible Discord channels",
-                    action=discovery_action,
+                    action=partial(
+                        _discover_and_queue_channels,
+                        queue,
+                        conn,
+                        config.scrape,
+                        page,
+                        scraper,
+                        source.base_url,
+                        source.name,
+                        source_id,
+                    ),
                 )
             )
             continue
 
+        states = db.get_sync_states(conn, source_id)
         for channel in enabled_channels:
-            channel_external_id = channel.url
             channel_id = db.upsert_channel(
                 conn,
                 source_id=source_id,
                 name=channel.name,
-                external_id=channel_external_id,
+                external_id=channel.url,
                 url=channel.url,
             )
-            state = db.get_sync_state(conn, source_id, channel_id)
-            mode = state["mode"] or "recent"
-            reason = "read recent activity" if mode == "recent" else "backfill backlog"
-
-            def make_sync_action(
-                page=page,
-                scraper=scraper,
-                source_id=source_id,
-                channel_id=channel_id,
-                channel_url=channel.url,
-                label=f"{source.name}:{channel.name}",
-            ):
-                return sync_channel(
-                    page,
-                    scraper,
-                    conn,
-                    source_id,
-                    channel_id,
-                    channel_url,
-                    config.scrape,
-                    label,
-                )
-
-            queue.add(
-                task_module.Task(
-                    name="sync_channel",
-                    source=source.name,
-                    channel=channel.name,
-                    reason=reason,
-                    action=make_sync_action,
-                )
+            state = states.get(channel_id) or db.get_sync_state(conn, source_id, channel_id)
+            _queue_channel_sync(
+                queue,
+                conn,
+                config.scrape,
+                page,
+                scraper,
+                source.name,
+                source_id,
+                channel_id,
+                channel.name,
+                channel.url,
+                state,
             )
 
-    if not queue.tasks:
+    if not queue:
         LOGGER.warning("No tasks queued for this cycle.")
         return
 
-    LOGGER.info("Task queue ready with %d tasks.", len(queue.tasks))
-    queue.run()
+    LOGGER.info("Task queue ready with %d tasks.", len(queue))
+    try:
+        queue.run()
+    finally:
+        task_module.flush_log_handlers()
 
 
 def run_once(config_path: Optional[str] = None) -> None:
@@ -792,6 +941,26 @@ def run_once(config_path: Optional[str] = None) -> None:
         context.close()
 
 
+def _watch_parent(parent_pid: int, parent_gone: threading.Event, wake: threading.Event) -> bool:
+    # A pidfd turns readable when the process exits, so one blocked poll()
+    # replaces a getppid() check per cycle and fires mid-sleep. Linux only.
+    try:
+        pidfd = os.pidfd_open(parent_pid)
+    except (AttributeError, OSError):
+        return False
+
+    def watch() -> None:
+        poller = select.poll()
+        poller.register(pidfd, select.POLLIN)
+        poller.poll()
+        os.close(pidfd)
+        parent_gone.set()
+        wake.set()
+
+    threading.Thread(target=watch, name="thoth-parent-watch", daemon=True).start()
+    return True
+
+
 def run_forever(config_path: Optional[str] = None) -> None:
     config = config_module.load_config(config_path)
     with sync_playwright() as playwright:
@@ -813,30 +982,49 @@ def run_forever(config_path: Optional[str] = None) -> None:
         except Exception:  # noqa: BLE001
             pass
         loop_delay = max(1, int(config.loop_delay_seconds))
-        while True:
-            if parent_pid and os.getppid() != parent_pid:
+        stop_requested = threading.Event()
+
+        def _request_stop(signum, frame) -> None:
+            # First Ctrl-C lets the current cycle finish; a second one aborts it.
+            if stop_requested.is_set():
+                raise KeyboardInterrupt
+            LOGGER.info("Stop requested; finishing the current cycle.")
+            stop_requested.set()
+
+        parent_gone = threading.Event()
+        poll_parent = bool(parent_pid) and not _watch_parent(parent_pid, parent_gone, stop_requested)
+        cycle = partial(run_cycle, conn, config, enabled_sources, pages_by_source, scrapers_by_source)
+        previous_handler = signal.signal(signal.SIGINT, _request_stop)
+        try:
+            while not stop_requested.is_set():
+                if poll_parent and os.getppid() != parent_pid:
+                    parent_gone.set()
+                    break
+                if context_closed["closed"]:
+                    LOGGER.error("Browser closed; stopping sync.")
+                    raise SystemExit(3)
+                try:
+                    cycle()
+                except Exception as exc:  # noqa: BLE001
+                    if context_closed["closed"] or _is_target_closed(exc):
+                        LOGGER.error("Browser closed; stopping sync.")
+                        raise SystemExit(3) from exc
+                    LOGGER.exception("Sync cycle failed: %s", exc)
+                LOGGER.info("Sync cycle complete. Sleeping %ds.", loop_delay)
+                # Returns as soon as SIGINT or the parent watcher sets the event.
+                stop_requested.wait(loop_delay)
+            if parent_gone.is_set():
                 LOGGER.error("Sync parent process is gone; stopping sync.")
                 raise SystemExit(4)
-            if context_closed["closed"]:
-                LOGGER.error("Browser closed; stopping sync.")
-                context.close()
-                raise SystemExit(3)
-            try:
-                run_cycle(conn, config, enabled_sources, pages_by_source, scrapers_by_source)
-            except Exception as exc:  # noqa: BLE001
-                if context_closed["closed"] or "Target closed" in str(exc):
-                    LOGGER.error("Browser closed; stopping sync.")
-                    raise SystemExit(3) from exc
-                LOGGER.exception("Sync cycle failed: %s", exc)
-            LOGGER.info("Sync cycle complete. Sleeping %ds.", loop_delay)
+            LOGGER.info("Sync loop interrupted; shutting down.")
+        finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            # Runs on every exit, including a second Ctrl-C mid-cycle, so the
+            # persistent profile is not left locked.
             try:
-                import time
-
-                time.sleep(loop_delay)
-            except KeyboardInterrupt:
-                LOGGER.info("Sync loop interrupted; shutting down.")
-                break
-        context.close()
+                context.close()
+            except Exception:  # noqa: BLE001
+                LOGGER.warning("Browser context did not close cleanly.")
 
 
 def build_arg_parser() -> argparse.ArgumentParser:
@@ -850,17 +1038,80 @@ def setup_logging() -> None:
     log_dir = pathlib.Path("logs")
     log_dir.mkdir(parents=True, exist_ok=True)
     log_path = log_dir / "sync.log"
-    logging.basicConfig(
-        level=logging.INFO,
-        format="[%(asctime)s] %(levelname)s %(message)s",
-        handlers=[logging.StreamHandler(), logging.FileHandler(log_path, encoding="utf-8")],
-        force=True,
-    )
+    handlers = [logging.StreamHandler(), task_module.BufferedFileHandler(log_path, encoding="utf-8")]
+    for handler in handlers:
+        handler.setFormatter(task_module.LOG_FORMATTER)
+    logging.basicConfig(level=logging.INFO, handlers=handlers, force=True)
     task_module.configure_task_logger(log_dir)
 
 
+_PLAYWRIGHT_PATH = ""
+# Keys of playwright's ParsedStackTrace, which _lean_playwright_stack_trace mimics.
+_PLAYWRIGHT_STACK_TRACE_KEYS = frozenset({"frames", "apiName", "title"})
+
+
+def _lean_playwright_stack_trace() -> dict:
+    # Stand-in for playwright's per-call stack capture: stops at the first
+    # caller frame instead of walking (and reading locals of) the whole stack.
+    frame = sys._getframe(2)
+    api_name = ""
+    frames = []
+    while frame:
+        code = frame.f_code
+        if code.co_filename.startswith(_PLAYWRIGHT_PATH):
+            api_name = getattr(code, "co_qualname", code.co_name)
+        elif api_name:
+            frames.append(
+                {"file": code.co_filename, "line": frame.f_lineno, "column": 0, "function": code.co_name}
+            )
+            break
+        frame = frame.f_back
+    return {"frames": frames, "apiName": api_name, "title": None}
+
+
+def configure_playwright_stack_capture() -> None:
+    # Opt-in (PW_INSPECT_STACK=0): the sync API records a full Python stack on
+    # every call only to annotate traces and error messages.
+    if os.environ.get("PW_INSPECT_STACK") != "0":
+        return
+    global _PLAYWRIGHT_PATH
+    try:
+        import playwright
+        from playwright._impl import _sync_base
+    except ImportError:
+        return
+    if hasattr(_sync_base, "_capture_stack_trace"):
+        # Private API: only replace it while it still looks like the function
+        # (and return shape) the lean version was written against.
+        from playwright._impl import _connection
+
+        parsed = getattr(_connection, "ParsedStackTrace", None)
+        if (
+            not callable(_sync_base._capture_stack_trace)
+            or set(getattr(parsed, "__annotations__", ())) != _PLAYWRIGHT_STACK_TRACE_KEYS
+        ):
+            LOGGER.warning("PW_INSPECT_STACK=0 ignored: unrecognized Playwright stack capture.")
+            return
+        _PLAYWRIGHT_PATH = os.path.dirname(playwright.__file__)
+        _sync_base._capture_stack_trace = _lean_playwright_stack_trace
+    elif getattr(_sync_base, "inspect", None) is inspect:
+        # Older releases store inspect.stack() per call and fall back to it again
+        # in the connection; both then parse an empty stack.
+        from playwright._impl import _connection
+
+        lean_inspect = types.SimpleNamespace(**{**vars(inspect), "stack": lambda *args: []})
+        _sync_base.inspect = lean_inspect
+        if getattr(_connection, "inspect", None) is inspect:
+            _connection.inspect = lean_inspect
+    else:
+        LOGGER.warning("PW_INSPECT_STACK=0 ignored: unrecognized Playwright version.")
+        return
+    LOGGER.info("Playwright per-call stack capture disabled (PW_INSPECT_STACK=0).")
+
+
 def main() -> None:
     setup_logging()
+    configure_playwright_stack_capture()
     args = build_arg_parser().parse_args()
     if args.once:
         run_once(args.config)
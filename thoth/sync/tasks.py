@@ -1,11 +1,57 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable, List, Optional
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, List, Optional, Set
 import logging
+import os
 import pathlib
 
 TASK_LOGGER = logging.getLogger("thoth.tasks")
+LOG_BUFFER_BYTES = 64 * 1024
+
+
+class SharedFormatter(logging.Formatter):
+    # Task records reach tasks.log, sync.log and the console; with one shared
+    # instance the timestamp and message are formatted once per record.
+    def format(self, record: logging.LogRecord) -> str:
+        cached = record.__dict__.get("_thoth_formatted")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        text = super().format(record)
+        record._thoth_formatted = (self, text)
+        return text
+
+
+LOG_FORMATTER = SharedFormatter("[%(asctime)s] %(levelname)s %(message)s")
+
+
+class BufferedFileHandler(logging.FileHandler):
+    # Batches INFO lines into 64 KiB writes; warnings and errors still flush at
+    # once. run_cycle flushes at the end of every cycle, logging.shutdown at exit.
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            encoding=self.encoding,
+            errors=self.errors,
+            buffering=LOG_BUFFER_BYTES,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except Exception:  # noqa: BLE001
+            self.handleError(record)
+
+
+def flush_log_handlers() -> None:
+    for logger in (logging.getLogger(), TASK_LOGGER):
+        for handler in logger.handlers:
+            handler.flush()
 
 
 @dataclass
@@ -15,52 +61,65 @@ class Task:
     channel: Optional[str]
     reason: str
     action: Callable[[], dict]
+    label: str = field(init=False, repr=False)
 
-    @property
-    def label(self) -> str:
-        if self.channel:
-            return f"{self.source}:{self.channel}"
-        return self.source
+    def __post_init__(self) -> None:
+        self.label = f"{self.source}:{self.channel}" if self.channel else self.source
 
 
 class TaskQueue:
     def __init__(self, logger: logging.Logger = TASK_LOGGER) -> None:
         self._tasks: List[Task] = []
         self._logger = logger
+        # Queues live for one cycle, so the level is checked once per queue.
+        self._info = logger.isEnabledFor(logging.INFO)
 
     @property
     def tasks(self) -> List[Task]:
         return list(self._tasks)
 
+    # Copy-free alternatives to `tasks` for sizing and read-only iteration.
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter(self._tasks)
+
     def add(self, task: Task) -> None:
         self._tasks.append(task)
-        self._logger.info(
-            "Task queued name=%s label=%s reason=%s",
-            task.name,
-            task.label,
-            task.reason,
-        )
+        if self._info:
+            self._logger.info(
+                "Task queued name=%s label=%s reason=%s",
+                task.name,
+                task.label,
+                task.reason,
+            )
 
     def run(self) -> None:
         for index, task in enumerate(self._tasks):
-            next_task = self._tasks[index + 1] if index + 1 < len(self._tasks) else None
-            self._logger.info(
-                "Task status current=%s next=%s",
-                f"{task.name}:{task.label}",
-                f"{next_task.name}:{next_task.label}" if next_task else "none",
-            )
-            self._logger.info("Task start name=%s label=%s", task.name, task.label)
+            if self._info:
+                next_task = self._tasks[index + 1] if index + 1 < len(self._tasks) else None
+                if next_task:
+                    self._logger.info(
+                        "Task status current=%s:%s next=%s:%s",
+                        task.name,
+                        task.label,
+                        next_task.name,
+                        next_task.label,
+                    )
+                else:
+                    self._logger.info("Task status current=%s:%s next=none", task.name, task.label)
+                self._logger.info("Task start name=%s label=%s", task.name, task.label)
             try:
                 result = task.action() or {}
-                status = result.get("status", "ok")
-                details = result.get("details") or ""
-                self._logger.info(
-                    "Task result name=%s label=%s status=%s details=%s",
-                    task.name,
-                    task.label,
-                    status,
-                    details,
-                )
+                if self._info:
+                    self._logger.info(
+                        "Task result name=%s label=%s status=%s details=%s",
+                        task.name,
+                        task.label,
+                        result.get("status", "ok"),
+                        result.get("details") or "",
+                    )
             except Exception as exc:  # noqa: BLE001
                 self._logger.exception(
                     "Task result name=%s label=%s status=error error=%s",
@@ -70,15 +129,18 @@ class TaskQueue:
                 )
 
 
+# Absolute paths, matching FileHandler.baseFilename.
+_CONFIGURED_LOG_PATHS: Set[str] = set()
+
+
 def configure_task_logger(log_dir: pathlib.Path) -> None:
+    log_path = os.path.abspath(log_dir / "tasks.log")
+    if log_path in _CONFIGURED_LOG_PATHS:
+        return
     log_dir.mkdir(parents=True, exist_ok=True)
-    log_path = log_dir / "tasks.log"
-    for handler in TASK_LOGGER.handlers:
-        if isinstance(handler, logging.FileHandler) and handler.baseFilename == str(log_path):
-            return
-    handler = logging.FileHandler(log_path, encoding="utf-8")
-    formatter = logging.Formatter("[%(asctime)s] %(levelname)s %(message)s")
-    handler.setFormatter(formatter)
+    _CONFIGURED_LOG_PATHS.add(log_path)
+    handler = BufferedFileHandler(log_path, encoding="utf-8")
+    handler.setFormatter(LOG_FORMATTER)
     TASK_LOGGER.addHandler(handler)
     TASK_LOGGER.setLevel(logging.INFO)
     TASK_LOGGER.propagate = True
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import json
+import re
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
-from playwright.sync_api import Page
+from playwright.sync_api import CDPSession, Page
 
 
+_EPOCH_RE = re.compile(r"\d+\.?\d*|\.\d+")
+_fromtimestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
+# Floor for each backfill scroll step, even when older messages render sooner.
+BACKFILL_MIN_STEP_DELAY_MS = 500
+
+
+# Overlapping scroll windows re-parse the same strings; results are immutable strs.
+@lru_cache(maxsize=8192)
 def parse_timestamp(raw: Optional[str]) -> Optional[str]:
     if not raw:
         return None
@@ -13,12 +26,11 @@ def parse_timestamp(raw: Optional[str]) -> Optional[str]:
     if not raw:
         return None
     # Slack-style numeric epoch with fractional seconds
-    try:
-        if raw.replace(".", "").isdigit():
-            seconds = float(raw)
-            return datetime.fromtimestamp(seconds, tz=timezone.utc).isoformat()
-    except ValueError:
-        pass
+    if _EPOCH_RE.fullmatch(raw):
+        try:
+            return _fromtimestamp(float(raw), tz=_UTC).isoformat()
+        except (ValueError, OverflowError, OSError):
+            return None
     # ISO 8601
     try:
         return datetime.fromisoformat(raw.replace("Z", "+00:00")).isoformat()
@@ -26,89 +38,256 @@ def parse_timestamp(raw: Optional[str]) -> Optional[str]:
         return None
 
 
-def extract_messages(page: Page, selectors: Dict[str, str]) -> List[Dict[str, Any]]:
-    return page.evaluate(
-        """
-        (sel) => {
-          if (!sel.message_item) {
-            return [];
-          }
-          const nodes = Array.from(document.querySelectorAll(sel.message_item));
-          return nodes.map(node => {
-            const getAttr = (el, attr) => el ? el.getAttribute(attr) : null;
-            const query = (q) => q ? node.querySelector(q) : null;
-            const text = (el) => el ? el.innerText.trim() : null;
-
-            const authorEl = query(sel.author);
-            const contentEl = query(sel.content);
-            const timeEl = query(sel.timestamp);
-            const replyEl = query(sel.reply_context);
-            const editedEl = query(sel.edited);
-
-            const messageId = sel.message_id_attr ? node.getAttribute(sel.message_id_attr) : null;
-            const rawTimestamp = sel.timestamp_attr ? getAttr(timeEl, sel.timestamp_attr) : (timeEl ? timeEl.getAttribute("datetime") || timeEl.getAttribute("data-ts") || timeEl.innerText : null);
-
-            const reactions = [];
-            if (sel.reaction_item) {
-              const reactionNodes = Array.from(node.querySelectorAll(sel.reaction_item));
-              for (const reaction of reactionNodes) {
-                const emojiEl = sel.reaction_emoji ? reaction.querySelector(sel.reaction_emoji) : null;
-                const countEl = sel.reaction_count ? reaction.querySelector(sel.reaction_count) : null;
-                const emoji = emojiEl ? (emojiEl.getAttribute("alt") || emojiEl.innerText || emojiEl.getAttribute("aria-label")) : null;
-                const countText = countEl ? countEl.innerText.trim() : "1";
-                reactions.push({
-                  emoji: emoji || "?",
-                  count: parseInt(countText || "1", 10) || 1,
-                });
-              }
-            }
-
-            return {
-              external_id: messageId || null,
-              author: text(authorEl),
-              content: text(contentEl),
-              content_raw: contentEl ? contentEl.innerHTML : null,
-              raw_timestamp: rawTimestamp,
-              edited: !!editedEl,
-              reply_context: replyEl ? replyEl.innerText.trim() : null,
-              reactions,
-            };
-          }).filter(msg => msg.external_id || msg.content);
+# Installed once per page (and re-run by Playwright on every new document), so
+# each evaluate below only ships a short call and its JSON arguments.
+#
+# harvestOlder scrolls up `steps` times and returns every distinct message seen
+# along the way in one payload. Each step waits at least `minDelay` ms (keeping
+# the scroll pace gentle) and at most `delay` ms for an older first message to
+# render. It stops early after two consecutive steps add nothing.
+#
+# channelLinks parses and dedupes channel anchors so only final records cross CDP.
+# With `wait` it polls in-page until some render, replacing a separate
+# wait_for_selector round-trip.
+#
+# scrollToBottom re-pins the scroll position every 100 ms until the content
+# height stops growing (or `settle` ms pass), instead of sleeping a fixed delay.
+# scrollAndExtract chains it with extractMessages (newest `limit` rows only;
+# a missing or non-positive limit returns every message).
+#
+# Selector arguments are optional once install_page_helpers has stored the
+# source's selectors as window.__thoth.sel.
+_PAGE_HELPERS_JS = """
+(() => {
+  // UTC ISO strings (Discord's <time datetime>) rewritten exactly as
+  // parse_timestamp would; anything else is left to Python.
+  const ISO_UTC = /^(\\d{4}-\\d\\d-\\d\\dT\\d\\d:\\d\\d:\\d\\d)(?:\\.(\\d{3}|\\d{6}))?Z$/;
+  const normalizeTimestamp = (raw) => {
+    const trimmed = raw ? raw.trim() : '';
+    const match = ISO_UTC.exec(trimmed);
+    if (!match) return null;
+    // Round-trip rejects dates Date.parse rolls over (e.g. Feb 30) but Python refuses.
+    const parsed = new Date(match[1] + 'Z');
+    if (Number.isNaN(parsed.getTime()) || parsed.toISOString().slice(0, 19) !== match[1]) return null;
+    const micros = (match[2] || '').padEnd(6, '0');
+    return match[1] + (/^0+$/.test(micros) ? '' : '.' + micros) + '+00:00';
+  };
+
+  const extractMessages = (sel) => {
+    sel = sel || window.__thoth.sel || {};
+    if (!sel.message_item) {
+      return [];
+    }
+    // Resolve which optional selectors exist once per batch, not per node.
+    const {
+      author, content, timestamp, reply_context: replyContext, edited,
+      message_id_attr: idAttr, timestamp_attr: timestampAttr,
+      reaction_item: reactionItem, reaction_emoji: reactionEmoji, reaction_count: reactionCount,
+    } = sel;
+    // innerText forces layout; keep it for author/content, where rendered text
+    // (hidden spans, <br> line breaks) matters, and for the fallback timestamp and
+    // reaction emoji, which feed stored identity keys (fallback external_id hash,
+    // reactions UNIQUE(message_id, emoji)). Read textContent elsewhere.
+    const text = (el) => el ? el.innerText.trim() : null;
+    const plainText = (el) => el ? el.textContent.replace(/\\s+/g, ' ').trim() : null;
+    const nodes = Array.from(document.querySelectorAll(sel.message_item));
+    return nodes.map(node => {
+      const authorEl = author ? node.querySelector(author) : null;
+      const contentEl = content ? node.querySelector(content) : null;
+      const timeEl = timestamp ? node.querySelector(timestamp) : null;
+      const replyEl = replyContext ? node.querySelector(replyContext) : null;
+      const editedEl = edited ? node.querySelector(edited) : null;
+
+      const messageId = idAttr ? node.getAttribute(idAttr) : null;
+      const rawTimestamp = !timeEl ? null : timestampAttr ? timeEl.getAttribute(timestampAttr) : (timeEl.getAttribute("datetime") || timeEl.getAttribute("data-ts") || timeEl.innerText);
+
+      const reactions = [];
+      if (reactionItem) {
+        const reactionNodes = node.querySelectorAll(reactionItem);
+        for (const reaction of reactionNodes) {
+          const emojiEl = reactionEmoji ? reaction.querySelector(reactionEmoji) : null;
+          const countEl = reactionCount ? reaction.querySelector(reactionCount) : null;
+          const emoji = emojiEl ? (emojiEl.getAttribute("alt") || emojiEl.innerText || emojiEl.getAttribute("aria-label")) : null;
+          const countText = countEl ? countEl.textContent.trim() : "1";
+          reactions.push({
+            emoji: emoji || "?",
+            count: parseInt(countText || "1", 10) || 1,
+          });
         }
-        """,
-        selectors,
+      }
+
+      return {
+        external_id: messageId || null,
+        author: text(authorEl),
+        content: text(contentEl),
+        content_raw: contentEl ? contentEl.innerHTML : null,
+        raw_timestamp: rawTimestamp,
+        timestamp: normalizeTimestamp(rawTimestamp),
+        edited: !!editedEl,
+        reply_context: plainText(replyEl),
+        reactions,
+      };
+    }).filter(msg => msg.external_id || msg.content);
+  };
+
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+  const harvestOlder = async ({sel, container, steps, pixels, delay, minDelay}) => {
+    sel = sel || window.__thoth.sel || {};
+    const keyOf = (msg) => msg.external_id || `${msg.raw_timestamp}|${msg.author}|${msg.content}`;
+    const seen = new Set();
+    const harvested = [];
+    let emptySteps = 0;
+    for (let step = 0; step < steps; step++) {
+      const first = sel.message_item ? document.querySelector(sel.message_item) : null;
+      const box = container ? document.querySelector(container) : null;
+      if (box) {
+        box.scrollTop = Math.max(0, box.scrollTop - pixels);
+      } else {
+        window.scrollBy(0, -pixels);
+      }
+      const started = Date.now();
+      const deadline = started + delay;
+      while (Date.now() < deadline && sel.message_item && document.querySelector(sel.message_item) === first) {
+        await sleep(50);
+      }
+      const floor = started + Math.min(delay, minDelay || 0);
+      if (Date.now() < floor) {
+        await sleep(floor - Date.now());
+      }
+      let added = 0;
+      for (const msg of extractMessages(sel)) {
+        const key = keyOf(msg);
+        if (seen.has(key)) continue;
+        seen.add(key);
+        harvested.push(msg);
+        added++;
+      }
+      emptySteps = added ? 0 : emptySteps + 1;
+      if (emptySteps >= 2) break;
+    }
+    return harvested;
+  };
+
+  const scanChannelLinks = (selector, base) => {
+    const seen = new Set();
+    const records = [];
+    for (const el of document.querySelectorAll(selector)) {
+      const href = el.getAttribute('href') || '';
+      const match = href.match(/\\/channels\\/([^/]+)\\/([^/]+)/) || href.match(/\\/channels\\/([^/]+)$/);
+      if (!match) continue;
+      const url = new URL(href, base).href;
+      if (seen.has(url)) continue;
+      seen.add(url);
+      const channelId = match[2] || '';
+      const label = (el.innerText || '').trim() || el.getAttribute('aria-label') || `channel-${channelId}`;
+      records.push({
+        name: label.replace(/\\s+/g, ' ').trim(),
+        url,
+        guild_id: match[1],
+        channel_id: channelId,
+      });
+    }
+    return records;
+  };
+
+  const channelLinks = async ([selector, base, wait]) => {
+    const deadline = Date.now() + (wait || 0);
+    let records = scanChannelLinks(selector, base);
+    while (!records.length && Date.now() < deadline) {
+      await sleep(100);
+      records = scanChannelLinks(selector, base);
+    }
+    return records;
+  };
+
+  const scrollToBottom = async (container, settle) => {
+    const box = container ? document.querySelector(container) : document.scrollingElement;
+    if (!box) return;
+    const deadline = Date.now() + (settle || 0);
+    let height = -1;
+    while (box.scrollHeight !== height && Date.now() < deadline) {
+      height = box.scrollHeight;
+      box.scrollTop = height;
+      await sleep(100);
+    }
+    box.scrollTop = box.scrollHeight;
+  };
+
+  const scrollAndExtract = async ({sel, container, settle, limit}) => {
+    await scrollToBottom(container, settle);
+    const messages = extractMessages(sel);
+    return limit == null || limit <= 0 ? messages : messages.slice(-limit);
+  };
+
+  window.__thoth = { harvestOlder, channelLinks, scrollAndExtract };
+})()
+"""
+
+
+def install_page_helpers(page: Page, selectors: Optional[Dict[str, str]] = None) -> None:
+    script = _PAGE_HELPERS_JS
+    if selectors is not None:
+        script += f";window.__thoth.sel = {json.dumps(selectors)};"
+    page.add_init_script(script)
+    page.evaluate(script)
+
+
+def scroll_and_extract(
+    page: Page,
+    selectors: Optional[Dict[str, str]],
+    container_selector: Optional[str],
+    settle_ms: int,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    return page.evaluate(
+        "(args) => window.__thoth.scrollAndExtract(args)",
+        {"sel": selectors, "container": container_selector, "settle": settle_ms, "limit": limit},
+    )
+
+
+def harvest_older_messages(
+    page: Page,
+    selectors: Optional[Dict[str, str]],
+    container_selector: Optional[str],
+    steps: int,
+    pixels: int,
+    delay_ms: int,
+    min_delay_ms: int = BACKFILL_MIN_STEP_DELAY_MS,
+) -> List[Dict[str, Any]]:
+    return page.evaluate(
+        "(args) => window.__thoth.harvestOlder(args)",
+        {
+            "sel": selectors,
+            "container": container_selector,
+            "steps": steps,
+            "pixels": pixels,
+            "delay": delay_ms,
+            "minDelay": min_delay_ms,
+        },
+    )
+
+
+def cdp_evaluate(cdp: CDPSession, expression: str) -> Any:
+    # Same main world as page.evaluate, so the __thoth helpers are reachable.
+    result = cdp.send(
+        "Runtime.evaluate",
+        {"expression": expression, "awaitPromise": True, "returnByValue": True},
     )
+    if "exceptionDetails" in result:
+        details = result["exceptionDetails"]
+        raise RuntimeError(details.get("exception", {}).get("description") or details.get("text"))
+    return result["result"].get("value")
 
 
-def scroll_to_bottom(page: Page, container_selector: Optional[str]) -> None:
-    if container_selector:
-        page.evaluate(
-            """
-            (selector) => {
-              const container = document.querySelector(selector);
-              if (container) {
-                container.scrollTop = container.scrollHeight;
-              }
-            }
-            """,
-            container_selector,
-        )
-        return
-    page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-
-
-def scroll_up(page: Page, container_selector: Optional[str], pixels: int) -> None:
-    if container_selector:
-        page.evaluate(
-            """
-            ({selector, pixels}) => {
-              const container = document.querySelector(selector);
-              if (container) {
-                container.scrollTop = Math.max(0, container.scrollTop - pixels);
-              }
-            }
-            """,
-            {"selector": container_selector, "pixels": pixels},
-        )
-        return
-    page.evaluate("(pixels) => window.scrollBy(0, -pixels)", pixels)
+def channel_links(
+    page: Page,
+    selector: str,
+    base_url: str,
+    wait_ms: int = 0,
+    cdp: Optional[CDPSession] = None,
+) -> List[Dict[str, str]]:
+    args = [selector, base_url, wait_ms]
+    if cdp is not None:
+        return cdp_evaluate(cdp, f"window.__thoth.channelLinks({json.dumps(args)})")
+    return page.evaluate("(args) => window.__thoth.channelLinks(args)", args)